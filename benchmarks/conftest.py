@@ -0,0 +1,128 @@
+"""Benchmark fixtures.
+
+Run the benchmarks with `pytest benchmarks`. The timings of all benchmarks are
+written as JSON to the path given by `--misosoup-benchmark-json`, such that runs
+can be compared.
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+RESULTS = []
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), "results", "benchmark.json")
+
+
+ANALYSIS_SIZES = {
+    "carbon-sources": (20, "carbon sources"),
+    "strains": (60, "strains"),
+    "solutions": (2, "solutions per carbon source and strain"),
+    "metabolites": (50, "exchanged metabolites"),
+}
+
+
+# options and fixtures are prefixed, such that they do not clash with
+# pytest-benchmark
+def pytest_addoption(parser):
+    parser.addoption(
+        "--misosoup-benchmark-json",
+        default=RESULTS_PATH,
+        help=(
+            "Path of the benchmark results. "
+            "Default: benchmarks/results/benchmark.json."
+        ),
+    )
+    parser.addoption(
+        "--misosoup-benchmark-rounds",
+        type=int,
+        default=5,
+        help="Number of rounds of each benchmark. Default: 5.",
+    )
+    for name, (default, description) in ANALYSIS_SIZES.items():
+        parser.addoption(
+            f"--misosoup-analysis-{name}",
+            type=int,
+            default=default,
+            help=(
+                f"Number of {description} of the solution table of the analysis "
+                f"benchmarks. Default: {default}."
+            ),
+        )
+
+
+class Benchmark:
+    """Time a function over several rounds."""
+
+    def __init__(self, name: str, rounds: int):
+        self.name = name
+        self.rounds = rounds
+        self.extra = {}
+
+    def __call__(self, func, setup=None, rounds=None):
+        """Time `func` and return the result of the last round.
+
+        If `setup` is given, it is called before every round and its result is
+        passed to `func` as arguments. The setup is not timed.
+        """
+        times = []
+        result = None
+        for _ in range(rounds or self.rounds):
+            args = setup() if setup is not None else ()
+            start = time.perf_counter()
+            result = func(*args)
+            times.append(time.perf_counter() - start)
+
+        RESULTS.append(
+            {
+                "name": self.name,
+                "rounds": len(times),
+                "min": min(times),
+                "max": max(times),
+                "mean": statistics.mean(times),
+                "median": statistics.median(times),
+                "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+                **self.extra,
+            }
+        )
+        return result
+
+
+@pytest.fixture
+def misosoup_benchmark(request):
+    """Benchmark of the current test."""
+    return Benchmark(
+        request.node.nodeid, request.config.getoption("misosoup_benchmark_rounds")
+    )
+
+
+@pytest.fixture(scope="session")
+def analysis_sizes(request):
+    """Size of the solution table of the analysis benchmarks."""
+    return {
+        name.replace("-", "_"): request.config.getoption(
+            f"misosoup_analysis_{name.replace('-', '_')}"
+        )
+        for name in ANALYSIS_SIZES
+    }
+
+
+def pytest_sessionfinish(session):
+    if not RESULTS:
+        return
+    output = {
+        "datetime": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "benchmarks": RESULTS,
+    }
+    path = session.config.getoption("misosoup_benchmark_json")
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf8") as file_descriptor:
+        json.dump(output, file_descriptor, indent=2)
@@ -0,0 +1,81 @@
+"""Benchmarks of the analysis functions on a generated solution table."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from misosoup.library import analysis
+
+
+def generate_solution_table(
+    n_carbon_sources, n_strains, n_solutions, n_metabolites, seed=0
+):
+    """Generate a solution table in the format of `read_solutions_yaml`.
+
+    Every solution contains the focal strain and up to two further members, which
+    exchange random amounts of the metabolites.
+    """
+    rng = np.random.default_rng(seed)
+    strains = [f"S{i:03d}" for i in range(n_strains)]
+    metabolites = [f"m{i:03d}" for i in range(n_metabolites)]
+
+    data = {}
+    for carbon_source in [f"cs{i:03d}" for i in range(n_carbon_sources)]:
+        for focal, strain in enumerate(strains):
+            for idx in range(n_solutions):
+                others = [i for i in range(n_strains) if i != focal]
+                members = [focal] + list(
+                    rng.choice(others, size=rng.integers(0, 3), replace=False)
+                )
+                row = {}
+                for member in members:
+                    row[f"y_{strains[member]}"] = 1
+                    row[f"Growth_{strains[member]}"] = rng.uniform(0.01, 1)
+                    exchanged = rng.choice(n_metabolites, size=5, replace=False)
+                    for metabolite in exchanged:
+                        rid = f"R_EX_{metabolites[metabolite]}_e"
+                        row[f"{rid}_{strains[member]}_i"] = rng.uniform(-10, 10)
+                        row[rid] = row.get(rid, 0) + rng.uniform(-1, 1)
+                row["community_growth"] = sum(
+                    row[f"Growth_{strains[member]}"] for member in members
+                )
+                data[(carbon_source, strain, idx)] = row
+
+    table = pd.DataFrame.from_dict(data, orient="index").fillna(0).sort_index(level=0)
+    table.index.names = ["carbon_source", "strain", "solution_idx"]
+    table["growth_rate"] = table.community_growth
+    return table
+
+
+@pytest.fixture(scope="module", name="solution_table")
+def fixture_solution_table(analysis_sizes):
+    return generate_solution_table(
+        analysis_sizes["carbon_sources"],
+        analysis_sizes["strains"],
+        analysis_sizes["solutions"],
+        analysis_sizes["metabolites"],
+    )
+
+
+@pytest.mark.parametrize(
+    "function",
+    [
+        analysis.get_suppliers,
+        analysis.get_communities,
+        analysis.compute_crossfeed,
+        analysis.compute_directed_crossfeed,
+        analysis.count_carbon_sources_for_strain,
+        analysis.count_carbon_sources_as_focal_strain,
+        analysis.count_carbon_sources_as_supplier_strain,
+        analysis.count_communities_as_supplier_strain,
+        analysis.count_isolated_strains_on_carbon_source,
+        analysis.count_non_redundant_supplying_communities_on_carbon_source,
+        analysis.count_exchanged_metabolites_on_carbon_source,
+    ],
+    ids=lambda function: function.__name__,
+)
+def test_analysis(misosoup_benchmark, solution_table, function):
+    """Apply analysis function to the solution table."""
+    misosoup_benchmark.extra["rows"] = len(solution_table)
+    misosoup_benchmark.extra["columns"] = len(solution_table.columns)
+    # row-wise functions take minutes on tables of production size
+    misosoup_benchmark(function, setup=lambda: (solution_table.copy(),), rounds=1)
@@ -0,0 +1,64 @@
+"""Benchmarks of model loading and community construction."""
+import glob
+import os
+
+import pytest
+
+from misosoup.library.readwrite import load_models, read_compounds
+from misosoup.reframed.layered_community import LayeredCommunity
+
+EXAMPLE_PATH = os.path.join(os.path.dirname(__file__), "..", "examples", "marine")
+MEDIA_PATH = os.path.join(EXAMPLE_PATH, "media.yaml")
+
+
+@pytest.fixture(scope="module", name="strain_paths")
+def fixture_strain_paths():
+    paths = sorted(glob.glob(os.path.join(EXAMPLE_PATH, "strains", "*.xml")))
+    if not paths:
+        pytest.fail(f"No strain models found in {EXAMPLE_PATH}")
+    return paths
+
+
+@pytest.fixture(scope="module", name="models")
+def fixture_models(strain_paths):
+    return load_models(strain_paths, use_cache=False)
+
+
+@pytest.fixture(scope="module", name="medium")
+def fixture_medium():
+    media = read_compounds(MEDIA_PATH)
+    base_medium = media.pop("base_medium", {})
+    return {**next(iter(media.values())), **base_medium}
+
+
+def test_load_models(misosoup_benchmark, strain_paths):
+    """Parse the models from their SBML files."""
+    misosoup_benchmark(lambda: load_models(strain_paths, use_cache=False))
+
+
+def test_load_cached_models(misosoup_benchmark, strain_paths, tmp_path):
+    """Load the models from the model cache."""
+    load_models(strain_paths, cache_dir=str(tmp_path))
+    misosoup_benchmark(lambda: load_models(strain_paths, cache_dir=str(tmp_path)))
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_community_construction(misosoup_benchmark, models, sparse):
+    """Merge the models and build the community problem."""
+    misosoup_benchmark(lambda: LayeredCommunity("community", models, sparse=sparse))
+
+
+def test_milp_setup(misosoup_benchmark, models, medium):
+    """Add binary variables, medium and focal strain to the community problem."""
+    focal_strain = models[0].id
+
+    def setup_milp(community):
+        community.setup_binary_variables(0.01)
+        community.setup_medium(medium)
+        community.setup_focal_strain(focal_strain, 0.01)
+        community.solver.update()
+
+    misosoup_benchmark(
+        setup_milp,
+        setup=lambda: (LayeredCommunity("community", models, sparse=True),),
+    )
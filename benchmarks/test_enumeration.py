@@ -0,0 +1,66 @@
+"""Benchmarks of the community enumeration."""
+import os
+
+import pytest
+
+from misosoup.library.getters import get_biomass, get_exchange_reactions
+from misosoup.library.minimizer import Enumeration, Minimizer, Verification
+from misosoup.library.readwrite import load_models, read_compounds
+from misosoup.reframed.layered_community import LayeredCommunity
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "tests", "data")
+MODEL_PATHS = [
+    os.path.join(DATA_PATH, "A1R12.xml"),
+    os.path.join(DATA_PATH, "I2R16.xml"),
+]
+MEDIA_PATH = os.path.join(DATA_PATH, "medium.yaml")
+
+
+@pytest.fixture(scope="module", name="models")
+def fixture_models():
+    missing = [path for path in MODEL_PATHS if not os.path.exists(path)]
+    if missing:
+        pytest.fail(f"Models not found: {', '.join(missing)}")
+    return load_models(MODEL_PATHS, use_cache=False)
+
+
+@pytest.fixture(scope="module", name="medium")
+def fixture_medium():
+    media = read_compounds(MEDIA_PATH)
+    return {**media["ac"], **media["base_medium"]}
+
+
+@pytest.mark.parametrize(
+    "verification, enumeration",
+    [
+        (Verification.REBUILD, Enumeration.ITERATIVE),
+        (Verification.RESTRICT, Enumeration.ITERATIVE),
+        (Verification.RESTRICT, Enumeration.LAZY),
+        (Verification.RESTRICT, Enumeration.LAYERED),
+    ],
+)
+def test_minimize(misosoup_benchmark, models, medium, verification, enumeration):
+    """Enumerate all communities of the focal strain with parsimony."""
+
+    def build_minimizer():
+        community = LayeredCommunity("community", models)
+        minimizer = Minimizer(
+            org_id="A1R12",
+            medium=medium,
+            community=community,
+            values=get_biomass(community)
+            + get_exchange_reactions(community.merged_model),
+            community_size=0,
+            objective={community.merged_model.biomass_reaction: 1},
+            parsimony=True,
+            parsimony_only=False,
+            minimal_growth=0.01,
+            verification=verification,
+            enumeration=enumeration,
+        )
+        return (minimizer,)
+
+    solutions = misosoup_benchmark(
+        lambda minimizer: minimizer.minimize(), setup=build_minimizer
+    )
+    assert solutions
@@ -0,0 +1,69 @@
+"""Checkpoint store for runs over several media and focal strains."""
+import hashlib
+import json
+import logging
+import os
+from urllib.parse import quote
+
+from .fileio import atomic_write
+
+
+class CheckpointStore:
+    """Checkpoints of the community search per medium and focal strain.
+
+    Each model collection has its own `namespace` in `directory`. Within it, every
+    medium and focal strain has a journal of the community search and a done file
+    with its solutions, once the search has finished. Checkpoints are keyed by the
+    composition of the medium and the search `settings`, such that they are not
+    reused if either changes.
+    """
+
+    def __init__(self, directory: str, namespace: str, settings: dict = None):
+        self.directory = os.path.join(directory, namespace)
+        self.settings = settings or {}
+
+    def journal_path(self, medium_id: str, medium: dict, strain: str) -> str:
+        """Path of the journal of the community search."""
+        return self._path(medium_id, medium, strain, ".journal")
+
+    def load_done(self, medium_id: str, medium: dict, strain: str):
+        """Solutions of a finished community search or `None` if not finished."""
+        path = self._path(medium_id, medium, strain, ".done")
+        if not os.path.exists(path):
+            medium_directory = os.path.dirname(os.path.dirname(path))
+            if os.path.isdir(medium_directory) and not os.path.isdir(
+                os.path.dirname(path)
+            ):
+                logging.warning(
+                    "Ignoring checkpoints of medium %s with a different composition "
+                    "or search settings.",
+                    medium_id,
+                )
+            return None
+        try:
+            with open(path, encoding="utf8") as file_descriptor:
+                return json.load(file_descriptor)
+        except (OSError, json.JSONDecodeError):
+            logging.warning("Ignoring corrupted checkpoint: %s", path)
+            return None
+
+    def mark_done(self, medium_id: str, medium: dict, strain: str, solutions: list):
+        """Store solutions and mark the community search as finished."""
+        path = self._path(medium_id, medium, strain, ".done")
+        with atomic_write(path) as file_descriptor:
+            json.dump(solutions, file_descriptor)
+
+    def _path(self, medium_id, medium, strain, suffix):
+        return os.path.join(
+            self.directory,
+            quote(str(medium_id), safe=""),
+            self._digest(medium),
+            quote(strain, safe="") + suffix,
+        )
+
+    def _digest(self, medium):
+        """Digest of the medium composition and the search settings."""
+        content = json.dumps(
+            {"medium": medium, "settings": self.settings}, sort_keys=True, default=str
+        )
+        return hashlib.sha256(content.encode("utf8")).hexdigest()[:16]
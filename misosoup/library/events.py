@@ -0,0 +1,16 @@
+"""Event log for the progress of the community search."""
+import time
+
+from .jsonlines import JsonLinesSink
+
+
+class EventLog(JsonLinesSink):
+    """Sink of minimizer events.
+
+    Every event is logged as one JSON line together with the context and a
+    timestamp.
+    """
+
+    def __call__(self, event: dict):
+        """Log event."""
+        self.write({"timestamp": time.time(), **event})
@@ -0,0 +1,53 @@
+"""Atomic file writes and compressed pickle files."""
+import logging
+import os
+import pickle
+import tempfile
+import zlib
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "w", sync: bool = True):
+    """Open temporary file that replaces `path` once it is completely written.
+
+    Concurrent readers never observe partially written files. With `sync`, the file
+    is synced to disk before it replaces `path`.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        encoding = None if "b" in mode else "utf8"
+        with os.fdopen(file_descriptor, mode, encoding=encoding) as tmp_fd:
+            yield tmp_fd
+            if sync:
+                tmp_fd.flush()
+                os.fsync(tmp_fd.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_compressed_pickle(path: str, default=None, description: str = "file"):
+    """Load compressed pickle. Returns `default` if it is missing or corrupted."""
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "rb") as file_descriptor:
+            return pickle.loads(zlib.decompress(file_descriptor.read()))
+    except Exception:  # pylint: disable=broad-except
+        logging.warning("Ignoring corrupted %s: %s", description, path)
+        return default
+
+
+def store_compressed_pickle(path: str, content, description: str = "file"):
+    """Store compressed pickle. Failed writes are only logged."""
+    data = zlib.compress(pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL), 1)
+    try:
+        with atomic_write(path, "wb", sync=False) as file_descriptor:
+            file_descriptor.write(data)
+    except OSError as error:
+        logging.warning("Unable to write %s: %s", description, error)
@@ -0,0 +1,86 @@
+"""Append-only journal for the minimizer cache file."""
+import json
+import logging
+import os
+import time
+
+from .fileio import atomic_write
+
+JOURNAL_FORMAT = 3
+
+
+class CacheJournal:
+    """Append-only journal of JSON records.
+
+    Every record is written as one line. Records are flushed immediately, but only
+    synced to disk every `sync_records` records or `sync_seconds` seconds, such that
+    at most the records of the last batch are lost on a crash. A partially written
+    last record is skipped when the journal is read. `compact` replaces the journal
+    by a snapshot of the current state.
+    """
+
+    def __init__(self, path: str, sync_records: int = 64, sync_seconds: float = 1.0):
+        self.path = path
+        self.sync_records = sync_records
+        self.sync_seconds = sync_seconds
+        self.records = 0
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @staticmethod
+    def is_journal(path: str) -> bool:
+        """Check if file is a journal rather than a YAML cache of previous versions."""
+        with open(path, encoding="utf8") as file_descriptor:
+            return file_descriptor.read(1) in ("{", "")
+
+    @staticmethod
+    def read(path: str) -> list:
+        """Read records of journal."""
+        records = []
+        with open(path, encoding="utf8") as file_descriptor:
+            for line_number, line in enumerate(file_descriptor, 1):
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logging.warning(
+                        "Ignoring incomplete journal record %i in %s", line_number, path
+                    )
+                    break
+        return records
+
+    def append(self, record: dict):
+        """Append record to journal."""
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf8")
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self.records += 1
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.sync_records
+            or time.monotonic() - self._last_sync >= self.sync_seconds
+        ):
+            self.sync()
+
+    def sync(self):
+        """Sync appended records to disk."""
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def compact(self, records: list):
+        """Replace journal by the given records."""
+        self.close()
+        with atomic_write(self.path) as file_descriptor:
+            for record in records:
+                file_descriptor.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.records = len(records)
+
+    def close(self):
+        """Sync and close journal."""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
@@ -0,0 +1,50 @@
+"""Append-only JSON lines files for run diagnostics."""
+import json
+import math
+import os
+
+
+class JsonLinesSink:
+    """Sink of JSON records in a file.
+
+    Every record is appended as one JSON line to `path` together with the `context`,
+    such that several processes and threads can write to the same file. Non-finite
+    numbers are written as `null`. Without `path` nothing is written.
+    """
+
+    def __init__(self, path: str = "", **context):
+        self.path = path
+        self.context = context
+
+    @property
+    def enabled(self) -> bool:
+        """Whether records are written."""
+        return bool(self.path)
+
+    def bind(self, **context):
+        """Sink to the same file with additional context."""
+        return type(self)(self.path, **{**self.context, **context})
+
+    def reset(self):
+        """Remove the records of previous runs."""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w", encoding="utf8"):
+            pass
+
+    def write(self, record: dict):
+        """Append record with the context."""
+        if not self.path:
+            return
+        record = {
+            key: None
+            if isinstance(value, float) and not math.isfinite(value)
+            else value
+            for key, value in {**self.context, **record}.items()
+        }
+        line = json.dumps(record, default=str) + "\n"
+        with open(self.path, "a", encoding="utf8") as file_descriptor:
+            file_descriptor.write(line)
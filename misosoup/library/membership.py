@@ -0,0 +1,39 @@
+"""Bitmask encoding of community membership."""
+
+
+class MembershipEncoder:
+    """Encode communities as integer bitmasks over a stable ordering of members.
+
+    Member `i` of the ordering corresponds to bit `i` of the mask, such that sets
+    of members can be compared and combined with integer operations.
+    """
+
+    def __init__(self, members: list):
+        self.members = list(members)
+        self._bits = {member: 1 << i for i, member in enumerate(self.members)}
+        self.full = (1 << len(self.members)) - 1
+
+    def encode(self, members) -> int:
+        """Encode members as bitmask."""
+        mask = 0
+        for member in members:
+            mask |= self._bits[member]
+        return mask
+
+    def decode(self, mask: int) -> list:
+        """Members of bitmask in the order of the encoder."""
+        members = []
+        while mask:
+            lowest = mask & -mask
+            members.append(self.members[lowest.bit_length() - 1])
+            mask ^= lowest
+        return members
+
+    def complement(self, mask: int) -> int:
+        """Bitmask of all members not in `mask`."""
+        return self.full ^ mask
+
+    @staticmethod
+    def size(mask: int) -> int:
+        """Number of members in bitmask."""
+        return bin(mask).count("1")
@@ -0,0 +1,58 @@
+"""Timing metrics of the computation phases."""
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+from .jsonlines import JsonLinesSink
+
+
+def peak_rss():
+    """Peak resident set size of the process in bytes or `None` if unavailable."""
+    if resource is None:
+        return None
+    return rss_bytes(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def rss_bytes(maxrss: int) -> int:
+    """Convert `ru_maxrss` of a resource usage to bytes."""
+    # linux reports kilobytes, macos bytes
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class MetricsRecorder(JsonLinesSink):
+    """Recorder of the metrics of computation phases.
+
+    Every phase is recorded as one JSON line together with the context, its wall
+    time and the peak memory of the process.
+    """
+
+    @contextmanager
+    def phase(self, name: str, solver=None, **fields):
+        """Record the wall time of a phase.
+
+        The yielded dictionary of `fields` can be extended within the phase. With a
+        `solver`, the statistics of its last optimization are added to the record.
+        """
+        if not self.path:
+            yield fields
+            return
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            self.record(name, time.perf_counter() - start, solver, **fields)
+
+    def record(self, name: str, wall_time: float, solver=None, **fields):
+        """Record a phase that took `wall_time` seconds."""
+        if not self.path:
+            return
+        record = {"phase": name, **fields, "wall_time": wall_time}
+        if solver is not None:
+            record.update(solver.statistics())
+        record["peak_rss"] = peak_rss()
+        self.write(record)
@@ -2,12 +2,23 @@
 
 import logging
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from enum import Enum
 
 import yaml
+from gurobipy import Env
 from reframed.solvers.solution import Solution, Status
 
-from ..reframed.layered_community import LayeredCommunity
+from ..reframed.layered_community import ENVIRONMENT_PARAMETERS, LayeredCommunity
+from .journal import JOURNAL_FORMAT, CacheJournal
+from .membership import MembershipEncoder
+from .metrics import MetricsRecorder
+from .solution_index import SolutionIndex
+from .verification_cache import VerificationCache
 
 
 class KnowledgeCriterion(Enum):
@@ -16,6 +27,34 @@ class KnowledgeCriterion(Enum):
     PARSIMONY = 2
 
 
+class Verification(Enum):
+    """Verification strategy for candidate communities.
+
+    `REBUILD` builds a new community model from the models of the candidate members.
+    `RESTRICT` reuses a copy of the base community problem and fixes the binary
+    variables of its members.
+    """
+
+    REBUILD = "rebuild"
+    RESTRICT = "restrict"
+
+
+class Enumeration(Enum):
+    """Enumeration strategy for candidate communities.
+
+    `ITERATIVE` solves the problem again after every candidate community.
+    `LAZY` verifies candidates during a single optimization and rejects them with
+    lazy constraints.
+    `LAYERED` bounds the community size by a cardinality constraint that is raised
+    one step at a time, such that all communities of one size are found before
+    larger communities are considered.
+    """
+
+    ITERATIVE = "iterative"
+    LAZY = "lazy"
+    LAYERED = "layered"
+
+
 class Minimizer:
     """Minimizer class."""
 
@@ -32,6 +71,15 @@ class Minimizer:
         minimal_growth: float,
         parsimony_tolerance: float = 1e-7,
         cache_file: str = "",
+        verification: Verification = Verification.REBUILD,
+        solution_pool: int = 0,
+        enumeration: Enumeration = Enumeration.ITERATIVE,
+        verification_workers: int = 0,
+        verification_cache: VerificationCache = None,
+        deadline: float = None,
+        milp_time_limit: float = 0,
+        metrics: MetricsRecorder = None,
+        on_event=None,
     ):
         """Initialize `Minimize`."""
         self.community = community
@@ -43,245 +91,707 @@ class Minimizer:
         self.parsimony = parsimony
         self.parsimony_only = parsimony_only
         self.parsimony_tolerance = parsimony_tolerance
+        self.solution_pool = solution_pool
+        self.enumeration = Enumeration(enumeration)
+        self.verification = Verification(verification)
+        self.verification_workers = verification_workers
+        self.verification_cache = verification_cache
+        self.deadline = deadline
+        self.milp_time_limit = milp_time_limit
+        self.complete = True
+        self.metrics = metrics if metrics is not None else MetricsRecorder()
+        self.on_event = on_event
+        self._start = time.perf_counter()
+        self._solve_statistics = None
+        self._candidate_telemetry = {}
+        self._iteration = 0
+        self._worker_state = threading.local()
+        self._verification_worker_states = None
 
         # setup binary variables for community solutions
         if not community.has_binary_variables:
             logging.debug("Setting up binary variables.")
-            self.community.setup_binary_variables(self.minimal_growth)
+            with self.metrics.phase("setup_binary_variables"):
+                self.community.setup_binary_variables(self.minimal_growth)
 
         # setup medium
-        self.community.setup_medium(self.medium)
+        with self.metrics.phase("setup_medium"):
+            self.community.setup_medium(self.medium)
 
-        if not org_id or org_id == "min":
-            self.community.solver.add_constraint(
-                "c_community_growth",
-                {community.merged_model.biomass_reaction: 1},
-                ">",
-                minimal_growth,
-            )
-        else:
-            self.community.solver.add_constraint(
-                f"c_{org_id}_focal",
-                {f"y_{org_id}": 1},
-                ">",
-                0.5,
-            )
+        # setup focal strain
+        with self.metrics.phase("setup_focal_strain"):
+            self.community.setup_focal_strain(org_id, self.minimal_growth)
 
         self.community.solver.update()
 
+        if self.solution_pool > 1:
+            self.community.solver.set_solution_pool(self.solution_pool)
+
+        # copy base problem before any community constraints are added
+        self._verification_community = None
+        if self.verification == Verification.RESTRICT:
+            logging.debug("Setting up verification community.")
+            with self.metrics.phase("setup_verification_community"):
+                self._verification_community = self.community.copy_for_verification(
+                    parsimony=self.parsimony or self.parsimony_only
+                )
+
         self._community_objective = {
             f"y_{org_id}": 1 for org_id in self.community.organisms.keys()
         }
 
-        self.solutions = []
+        self._get_values = list(self._community_objective.keys()) + self.values
+        self._encoder = MembershipEncoder(self._community_objective.keys())
+        self._solution_index = SolutionIndex()
         self.community_constraints = {}
         self.knowledge_constraints = {}
+        self._next_community_constraint = None
+        self._lazy_constraints = set()
 
         self.cache_file = cache_file
-        if cache_file and os.path.exists(cache_file):
-            logging.info("Loading constraints from cache file: %s", cache_file)
-            with open(cache_file, encoding="utf8") as cache_fd:
-                cache = yaml.load(cache_fd, Loader=yaml.CSafeLoader)
-            logging.debug("Loaded %i solutions.", len(cache["solutions"]))
-            logging.debug(
-                "Loaded %i knowledge constraints.", len(cache["knowledge_constraints"])
-            )
-            logging.debug(
-                "Loaded %i community constraints.", len(cache["community_constraints"])
-            )
-            self._load_constraints_from_cache(cache)
+        self._journal = None
+        if cache_file:
+            if os.path.exists(cache_file):
+                logging.info("Loading constraints from cache file: %s", cache_file)
+                self._load_constraints_from_cache(_read_cache(cache_file))
+                logging.debug("Loaded %i solutions.", len(self._solution_index))
+                logging.debug(
+                    "Loaded %i knowledge constraints.", len(self.knowledge_constraints)
+                )
+                logging.debug(
+                    "Loaded %i community constraints.", len(self.community_constraints)
+                )
+            self._journal = CacheJournal(cache_file)
+            self._journal.compact(self._cache_records())
 
     def minimize(self):
-        """Minimize community."""
-        i = len(self.community_constraints)
-        while True:
-            if self.cache_file:
-                self._dump_constraints_to_cache()
+        """Minimize community.
+
+        If the `deadline` passes, the search stops with the solutions found so far
+        and `complete` is set to `False`.
+
+        Progress is reported to `on_event` with a dictionary for each event. Events
+        of verifications may be reported from verification threads.
+        """
+        self._start = time.perf_counter()
+        try:
+            if self.enumeration == Enumeration.LAZY:
+                self._minimize_lazy()
+            elif self.enumeration == Enumeration.LAYERED:
+                self._minimize_layered()
+            elif self.verification_workers > 0:
+                self._minimize_pipelined()
+            else:
+                self._minimize_iterative()
+        finally:
+            self.community.solver.set_time_limit(None)
+            if self.solution_pool > 1:
+                self.community.solver.set_solution_pool(None)
+
+        if self._journal is not None:
+            self._journal.close()
+
+        self._emit("search_done", complete=self.complete)
+
+        for constraint in self.knowledge_constraints:
+            if constraint not in self._lazy_constraints:
+                self.community.solver.remove_constraint(constraint)
+
+        for constraint in self.community_constraints:
+            if constraint not in self._lazy_constraints:
+                self.community.solver.remove_constraint(constraint)
 
+        return self.solutions
+
+    def _minimize_iterative(self):
+        """Enumerate communities by solving the problem again after each cut."""
+        while not self._out_of_time():
             logging.info("------------")
             logging.info("Starting community search...")
 
             solution = self._minimize_community()
 
-            if solution.status != Status.OPTIMAL:
+            if solution.status not in (Status.OPTIMAL, Status.SUBOPTIMAL):
                 logging.info("Solution status: %s", str(solution.status))
                 break
 
-            # get community members
-            selected_names = [
-                k[2:]
-                for k in self._community_objective.keys()
-                if solution.values[k] > 0.5
-            ]
+            size_exceeded = False
+            for values in self._candidate_values(solution):
+                selected = self._candidate_members(values)
 
-            # create dictionaries for selected and not selected community members
-            # these need to be dictionaries instead of sets to be used as constraints in reframed
-            selected = {
-                k: 1
-                for k in self._community_objective.keys()
-                if solution.values[k] > 0.5
-            }
-            not_selected = {
-                k: 1
-                for k in self._community_objective.keys()
-                if solution.values[k] < 0.5
-            }
+                community_solution = self._verify_community(self._names(selected))
+                if community_solution is None:
+                    logging.info(
+                        "Community Inconsistent: %s", str(self._names(selected))
+                    )
+                    logging.debug("Add knowlege constraint.")
+                    self._add_knowledge_constraint(self._encoder.complement(selected))
+                    self._emit("cut", selected, kind="knowledge")
+                    continue
 
-            logging.info("Community size: %i", len(selected))
-            logging.info(
-                "Community growth: %f",
-                solution.values[self.community.merged_model.biomass_reaction],
+                # stop community search if we have reached the desired maximal community size
+                # this can result in missing solutions as we might find larger communities first
+                size_exceeded = bool(
+                    self.community_size
+                    and self._encoder.size(selected) > self.community_size
+                )
+
+                # the solution is recorded before its cut, such that an interrupted run
+                # finds the community again instead of losing it
+                if not size_exceeded:
+                    self._add_solution(selected, community_solution)
+                self._add_community_constraint(
+                    self._community_constraint_name(), selected
+                )
+                self._emit("cut", selected, kind="community")
+
+                if size_exceeded:
+                    # a suboptimal candidate does not rule out smaller communities
+                    if solution.status != Status.OPTIMAL:
+                        self.complete = False
+                    break
+
+            self.community.solver.update()
+
+            if size_exceeded:
+                break
+
+    def _minimize_pipelined(self):
+        """Enumerate communities while candidates are verified concurrently.
+
+        Each candidate is excluded with its cut right away and verified in a worker
+        thread while the search continues. If the verification fails, the cut is
+        replaced by a knowledge constraint. Verification results are processed in
+        the order of the candidates, such that the solutions match a serial run.
+        """
+        pending = []
+        worker_states = queue.SimpleQueue()
+        for state in self._prepare_verification_workers():
+            worker_states.put(state)
+        with ThreadPoolExecutor(
+            max_workers=self.verification_workers,
+            initializer=self._init_verification_worker,
+            initargs=(worker_states,),
+        ) as executor:
+            while True:
+                if self._out_of_time():
+                    self._collect_verifications(pending, wait=True)
+                    break
+
+                logging.info("------------")
+                logging.info("Starting community search...")
+
+                solution = self._minimize_community()
+
+                exhausted = solution.status not in (Status.OPTIMAL, Status.SUBOPTIMAL)
+                if exhausted:
+                    logging.info("Solution status: %s", str(solution.status))
+                else:
+                    for values in self._candidate_values(solution):
+                        selected = self._candidate_members(values)
+
+                        # stop community search if we have reached the desired maximal community size
+                        if (
+                            self.community_size
+                            and self._encoder.size(selected) > self.community_size
+                        ):
+                            if solution.status != Status.OPTIMAL:
+                                self.complete = False
+                            exhausted = True
+                            break
+
+                        name = self._community_constraint_name()
+                        self._add_community_constraint(name, selected, record=False)
+                        self._emit("cut", selected, kind="community")
+                        future = executor.submit(
+                            self._verify_community, self._names(selected)
+                        )
+                        pending.append((name, selected, future))
+
+                    self.community.solver.update()
+
+                # wait for all verifications once no candidates are left, as failed
+                # verifications can open up the search space again
+                failed = self._collect_verifications(pending, wait=exhausted)
+                if exhausted and not failed:
+                    break
+
+    def _minimize_layered(self):
+        """Enumerate communities in layers of increasing community size.
+
+        The community size is bounded by a cardinality constraint. Once no further
+        communities are found within the bound, all communities of that size are
+        known and the bound is raised by one until the maximal community size.
+        """
+        max_size = self.community_size or len(self._community_objective)
+        self.community.solver.add_constraint(
+            "c_community_size", self._community_objective, "<", 1
+        )
+        try:
+            for size in range(1, max_size + 1):
+                if self._out_of_time():
+                    break
+                logging.info("Enumerating communities of size %i.", size)
+                self.community.solver.set_rhs({"c_community_size": size})
+                if self.verification_workers > 0:
+                    self._minimize_pipelined()
+                else:
+                    self._minimize_iterative()
+                if not self.complete:
+                    break
+                logging.info(
+                    "Completed communities of size %i: %i solutions retained.",
+                    size,
+                    len(self._solution_index),
+                )
+        finally:
+            self.community.solver.remove_constraint("c_community_size")
+
+    def _prepare_verification_workers(self) -> list:
+        """Environments and verification communities of the verification workers.
+
+        Gurobi environments and their models are not thread-safe, so the copies of
+        the verification community are made on the main thread before the workers
+        start. Workers only use their own environment and copy.
+        """
+        if self._verification_worker_states is None:
+            self._verification_worker_states = []
+            for _ in range(self.verification_workers):
+                env = Env(params={**ENVIRONMENT_PARAMETERS, "Threads": 1})
+                verification_community = None
+                if self._verification_community is not None:
+                    verification_community = self._verification_community.copy(env=env)
+                self._verification_worker_states.append((env, verification_community))
+        return self._verification_worker_states
+
+    def _init_verification_worker(self, worker_states: queue.SimpleQueue):
+        env, verification_community = worker_states.get_nowait()
+        self._worker_state.env = env
+        if verification_community is not None:
+            self._worker_state.verification_community = verification_community
+
+    def _collect_verifications(self, pending: list, wait: bool):
+        """Process verification results in candidate order.
+
+        If a verification fails, the candidates found after it are discarded, as
+        they were found without the knowledge constraint of the failed candidate.
+        Returns whether a verification failed.
+        """
+        while pending and (wait or pending[0][-1].done()):
+            name, selected, future = pending.pop(0)
+            community_solution = future.result()
+            if community_solution is not None:
+                self._add_solution(selected, community_solution)
+                self._record({"type": "community", "name": name, "mask": selected})
+                continue
+
+            logging.info("Community Inconsistent: %s", str(self._names(selected)))
+            logging.debug("Replace community constraint with knowledge constraint.")
+            for discarded_name, _, discarded_future in pending:
+                discarded_future.cancel()
+                self.community.solver.remove_constraint(discarded_name)
+                del self.community_constraints[discarded_name]
+            pending.clear()
+            self.community.solver.remove_constraint(name)
+            del self.community_constraints[name]
+            self._add_knowledge_constraint(self._encoder.complement(selected))
+            self._emit("cut", selected, kind="knowledge")
+            self.community.solver.update()
+            return True
+
+        return False
+
+    def _minimize_lazy(self):
+        """Enumerate communities in a single optimization.
+
+        Every incumbent community is verified inside the optimization and rejected
+        with a lazy constraint, such that the search tree is kept between candidates.
+        """
+        candidate_cuts = {}
+
+        def reject_candidate(values):
+            selected = self._candidate_members(values)
+            if selected in candidate_cuts:
+                return [candidate_cuts[selected]]
+
+            community_solution = self._verify_community(self._names(selected))
+            if community_solution is None:
+                logging.info("Community Inconsistent: %s", str(self._names(selected)))
+                not_selected = self._encoder.complement(selected)
+                constraint_name = f"c_tmp_{len(self.knowledge_constraints) + 1}"
+                self.knowledge_constraints[constraint_name] = not_selected
+                self._record(
+                    {"type": "knowledge", "name": constraint_name, "mask": not_selected}
+                )
+                candidate_cuts[selected] = (self._lhs(not_selected), ">", 1)
+                self._emit("cut", selected, kind="knowledge")
+            else:
+                self._add_solution(selected, community_solution)
+                constraint_name = self._community_constraint_name()
+                self.community_constraints[constraint_name] = selected
+                self._record(
+                    {"type": "community", "name": constraint_name, "mask": selected}
+                )
+                candidate_cuts[selected] = (
+                    self._lhs(selected),
+                    "<",
+                    self._encoder.size(selected) - 1,
+                )
+                self._emit("cut", selected, kind="community")
+            self._lazy_constraints.add(constraint_name)
+
+            return [candidate_cuts[selected]]
+
+        if self.community_size:
+            self.community.solver.add_constraint(
+                "c_community_size",
+                self._community_objective,
+                "<",
+                self.community_size,
             )
 
-            # build community model
-            selected_models = [
-                model
-                for org_id, model in self.community.organisms.items()
-                if org_id in selected_names
-            ]
-            community = LayeredCommunity(
-                f"{selected_names}",
-                selected_models,
-                params=self.community.solver.params,
+        logging.info("------------")
+        logging.info("Starting community search with lazy constraints...")
+
+        self.community.solver.set_time_limit(self._solve_time_limit())
+        try:
+            with self.metrics.phase("milp", solver=self.community.solver) as fields:
+                status = self.community.solver.solve_lazy(
+                    self._community_objective,
+                    list(self._community_objective.keys())
+                    + [self.community.merged_model.biomass_reaction],
+                    reject_candidate,
+                )
+                fields["status"] = status.value
+            time_limit_reached = self.community.solver.time_limit_reached
+        finally:
+            if self.community_size:
+                self.community.solver.remove_constraint("c_community_size")
+
+        # all candidates were found in the same optimization
+        if self.community.solver.telemetry is not None:
+            statistics = self.community.solver.telemetry[-1]
+            for mask in self._candidate_telemetry:
+                self._candidate_telemetry[mask] = statistics
+
+        logging.info("Solution status: %s", str(status))
+        if time_limit_reached:
+            logging.warning("Time limit reached, community search is incomplete.")
+            self.complete = False
+
+    def _candidate_members(self, values: dict) -> int:
+        """Bitmask of the members of a candidate community."""
+        selected = self._encoder.encode(
+            k for k in self._community_objective.keys() if values[k] > 0.5
+        )
+
+        growth = values[self.community.merged_model.biomass_reaction]
+        logging.info("Community size: %i", self._encoder.size(selected))
+        logging.info("Community growth: %f", growth)
+        self._emit("candidate", selected, growth=growth)
+        if self.community.solver.telemetry is not None:
+            self._candidate_telemetry[selected] = self._solve_statistics
+
+        return selected
+
+    def _add_solution(self, selected: int, community_solution: dict):
+        superset_masks = self._retain_solution(selected, community_solution)
+        if superset_masks:
+            for mask in superset_masks:
+                logging.info(
+                    "Found superset solution for community: %s", str(self._names(mask))
+                )
+            logging.info(
+                "Replace solution with community: %s", str(self._names(selected))
+            )
+        else:
+            logging.info(
+                "Retain solution for community: %s", str(self._names(selected))
+            )
+        self._record(
+            {"type": "solution", "mask": selected, "solution": community_solution}
+        )
+        if self.on_event is not None:
+            self._emit(
+                "solution",
+                selected,
+                replaced=[self._names(mask) for mask in superset_masks],
             )
 
-            community.setup_growth_requirement(self.minimal_growth)
-            community.setup_medium(self.medium)
+    def _emit(self, event: str, mask: int = None, **fields):
+        """Report event with the current progress to `on_event`."""
+        if self.on_event is None:
+            return
+        if mask is not None:
+            fields["members"] = self._names(mask)
+        self.on_event(
+            {
+                "event": event,
+                "elapsed": time.perf_counter() - self._start,
+                "community_constraints": len(self.community_constraints),
+                "knowledge_constraints": len(self.knowledge_constraints),
+                "solutions": len(self._solution_index),
+                **fields,
+            }
+        )
 
-            if self.parsimony or self.parsimony_only:
-                logging.info("Setup parsimony variables.")
-                community.setup_parsimony()
+    def _retain_solution(self, selected: int, community_solution: dict) -> list:
+        """Retain solution and return the memberships of the replaced solutions."""
+        # we need to check if there are solutions that contain this community
+        # and replace them with the current solution as it has less members
+        superset_slots = self._solution_index.supersets(selected)
+        superset_masks = [self._solution_index.mask(slot) for slot in superset_slots]
+        if superset_slots:
+            self._solution_index.replace(superset_slots, selected, community_solution)
+        else:
+            self._solution_index.add(selected, community_solution)
+        return superset_masks
+
+    def _names(self, mask: int) -> list:
+        """Names of the members in bitmask."""
+        return [k[2:] for k in self._encoder.decode(mask)]
+
+    def _lhs(self, mask: int) -> dict:
+        """Binary variables of the members in bitmask.
+
+        These need to be dictionaries instead of sets to be used as constraints in
+        reframed.
+        """
+        return {k: 1 for k in self._encoder.decode(mask)}
+
+    @property
+    def solutions(self) -> list:
+        """Retained community solutions."""
+        return [
+            {"community": self._lhs(mask), "solution": community_solution}
+            for mask, community_solution in self._solution_index.items()
+        ]
 
+    @property
+    def solution_telemetry(self) -> list:
+        """Solver statistics of the optimizations that found the retained solutions.
+
+        Only solutions found in this run with solver telemetry are included.
+        """
+        return [
+            {"community": self._lhs(mask), "telemetry": self._candidate_telemetry[mask]}
+            for mask, _ in self._solution_index.items()
+            if mask in self._candidate_telemetry
+        ]
+
+    def _verify_community(self, selected_names: list):
+        """Verify candidate community.
+
+        Returns the solution of the candidate community or `None` if any of the
+        optimizations fails. Results are looked up in the verification cache first.
+        """
+        start = time.perf_counter()
+        cached, community_solution = self._cached_verification(selected_names)
+        self._emit(
+            "verification",
+            members=selected_names,
+            passed=community_solution is not None,
+            cached=cached,
+            duration=time.perf_counter() - start,
+        )
+        return community_solution
+
+    def _cached_verification(self, selected_names: list):
+        """Whether the verification result was cached and the result itself."""
+        if self.verification_cache is None:
+            return False, self._verify_candidate(selected_names)
+
+        key = self.verification_cache.key(
+            selected_names,
+            medium=sorted(self.medium.items()),
+            objective=sorted(self.objective.items()) if self.objective else None,
+            values=self.values,
+            parsimony=self.parsimony,
+            parsimony_only=self.parsimony_only,
+            parsimony_tolerance=self.parsimony_tolerance,
+            minimal_growth=self.minimal_growth,
+            # the verification modes bound the member exchanges differently
+            verification=self.verification.value,
+            sparse=self.community.sparse,
+            params=sorted(
+                (parameter.name, value)
+                for parameter, value in (self.community.solver.params or {}).items()
+            ),
+        )
+        cached, community_solution = self.verification_cache.get(key)
+        if cached:
+            logging.info("Use cached verification for community: %s", selected_names)
+            if community_solution is not None:
+                community_solution = dict(community_solution)
+            return True, community_solution
+
+        community_solution = self._verify_candidate(selected_names)
+        self.verification_cache.put(key, community_solution)
+        return False, community_solution
+
+    def _verify_candidate(self, selected_names: list):
+        with self._candidate_community(selected_names) as community:
             objective_value = 0
             community_solution = {}
 
             if self.objective:
                 logging.info("Starting objective optimization.")
-                objective_solution = community.objective_optimization(
-                    self.objective,
-                    self._get_values,
-                )
+                with self.metrics.phase(
+                    "objective_optimization",
+                    solver=community.solver,
+                    members=len(selected_names),
+                ):
+                    objective_solution = community.objective_optimization(
+                        self.objective,
+                        self.values,
+                    )
 
                 # check objective solution
                 if not self._check_solution(objective_solution):
                     logging.warning("Unable to optimize objective.")
-                    logging.info("Community Inconsistent: %s", str(selected_names))
-                    logging.debug("Add knowlege constraint.")
-                    self._add_knowledge_constraint(not_selected)
-                    continue
+                    return None
 
-                # compute objective value
-                for k, v in self.objective.items():
-                    if k in objective_solution.values:
-                        objective_value += v * objective_solution.values[k]
+                objective_value = objective_solution.fobj
 
                 # retain solution
-                community_solution = _get_dict(
-                    objective_solution,
-                    self._get_values,
-                )
+                community_solution = _get_dict(objective_solution)
 
             if self.parsimony and objective_value:
                 logging.info("Starting parsimony optimization.")
-                parsimony_solution = community.parsimony_optimization(
-                    self.objective,
-                    objective_value - self.parsimony_tolerance,
-                    self._get_values,
-                )
+                with self.metrics.phase(
+                    "parsimony_optimization",
+                    solver=community.solver,
+                    members=len(selected_names),
+                ):
+                    parsimony_solution = community.parsimony_optimization(
+                        self.objective,
+                        objective_value - self.parsimony_tolerance,
+                        self.values,
+                    )
 
                 # check parsimony solution
                 if not self._check_solution(parsimony_solution):
                     logging.warning("Unable to minimize fluxes.")
-                    logging.info("Community Inconsistent: %s", str(selected_names))
-                    logging.debug("Add knowlege constraint.")
-                    self._add_knowledge_constraint(not_selected)
-                    continue
+                    return None
 
-                community_solution = _get_dict(
-                    parsimony_solution,
-                    self._get_values,
-                )
+                community_solution = _get_dict(parsimony_solution)
 
             if self.parsimony_only:
                 logging.info("Starting parsimony only optimization.")
-                parsimony_only_solution = community.parsimony_optimization(
-                    self.objective,
-                    0,
-                    self._get_values,
-                )
+                with self.metrics.phase(
+                    "parsimony_only_optimization",
+                    solver=community.solver,
+                    members=len(selected_names),
+                ):
+                    parsimony_only_solution = community.parsimony_optimization(
+                        self.objective,
+                        0,
+                        self.values,
+                    )
 
                 # check parsimony solution
                 if not self._check_solution(parsimony_only_solution):
                     logging.warning("Unable to minimize fluxes.")
-                    logging.info("Community Inconsistent: %s", str(selected_names))
-                    logging.debug("Add knowlege constraint.")
-                    self._add_knowledge_constraint(not_selected)
-                    continue
-
-                community_solution = _get_dict(
-                    parsimony_only_solution,
-                    self._get_values,
-                )
-
-            self.community.solver.add_constraint(
-                f"c_{i}", selected, "<", len(selected) - 1
-            )
-            self.community.solver.update()
-            self.community_constraints[f"c_{i}"] = selected
+                    return None
 
-            # stop community search if we have reached the desired maximal community size
-            # this can result in missing solutions as we might find larger communities first
-            if self.community_size and len(selected) > self.community_size:
-                break
+                community_solution = _get_dict(parsimony_only_solution)
 
-            # we need to check if there is a solution that contains this community
-            # and replace it with the current solution if it has less members
-            superset_index = -1
-            selected_set = set(selected.keys())
-            for i, s in enumerate(self.solutions):
-                if set(s["community"].keys()).issuperset(selected_set):
-                    logging.info(
-                        "Found superset solution for community: %s",
-                        str(s["community"].keys()),
-                    )
-                    superset_index = i
-                    break
+        return community_solution
 
-            if superset_index >= 0:
-                logging.info("Replace solution with community: %s", str(selected_names))
-                self.solutions[superset_index] = {
-                    "community": selected,
-                    "solution": community_solution,
-                }
-            else:
-                logging.info("Retain solution for community: %s", str(selected_names))
-                self.solutions.append(
-                    {"community": selected, "solution": community_solution}
-                )
+    @contextmanager
+    def _candidate_community(self, selected_names: list):
+        verification_community = getattr(
+            self._worker_state,
+            "verification_community",
+            self._verification_community,
+        )
+        if verification_community is not None:
+            with verification_community.restrict_members(selected_names) as community:
+                yield community
+            return
+
+        # build community model
+        selected_models = [
+            model
+            for org_id, model in self.community.organisms.items()
+            if org_id in selected_names
+        ]
+        with self.metrics.phase(
+            "build_candidate", members=len(selected_names)
+        ) as fields:
+            community = LayeredCommunity(
+                f"{selected_names}",
+                selected_models,
+                env=getattr(self._worker_state, "env", self.community.env),
+                params=self.community.solver.params,
+                sparse=self.community.sparse,
+            )
+            fields.update(community.timings)
 
-            i += 1
+            community.setup_growth_requirement(self.minimal_growth)
+            community.setup_medium(self.medium)
 
-        if self.cache_file:
-            self._dump_constraints_to_cache()
+            if self.parsimony or self.parsimony_only:
+                logging.info("Setup parsimony variables.")
+                community.setup_parsimony()
 
-        for constraint in self.knowledge_constraints.values():
-            self.community.solver.remove_constraint(constraint)
+        yield community
 
-        for constraint in self.community_constraints.values():
-            self.community.solver.remove_constraint(constraint)
+    def _candidate_values(self, solution: Solution):
+        """Membership values of candidate communities found by the last solve.
 
-        return self.solutions
+        Without solution pool only the optimal solution is a candidate. Otherwise,
+        every distinct membership of the solution pool is a candidate.
+        """
+        if self.solution_pool <= 1:
+            return [solution.values]
 
-    @property
-    def _get_values(self):
-        return list(self._community_objective.keys()) + self.values
+        var_ids = list(self._community_objective.keys()) + [
+            self.community.merged_model.biomass_reaction
+        ]
+        candidates = {}
+        for values in self.community.solver.get_pool_values(var_ids):
+            membership = tuple(k for k in self._community_objective if values[k] > 0.5)
+            candidates.setdefault(membership, values)
+        logging.debug("Found %i candidates in solution pool.", len(candidates))
+        return list(candidates.values())
 
     def _minimize_community(self) -> Solution:
-        return self.community.solver.solve(
-            objective=self._community_objective,
-            get_values=self._get_values,
-            minimize=True,
-        )
+        self.community.solver.set_time_limit(self._solve_time_limit())
+        self._iteration += 1
+        with self.metrics.phase(
+            "milp", solver=self.community.solver, iteration=self._iteration
+        ) as fields:
+            solution = self.community.solver.solve(
+                objective=self._community_objective,
+                get_values=self._get_values,
+                minimize=True,
+                allow_suboptimal=True,
+            )
+            fields["status"] = solution.status.value
+        if self.community.solver.telemetry is not None:
+            self._solve_statistics = self.community.solver.telemetry[-1]
+        if self.community.solver.time_limit_reached:
+            if solution.status == Status.SUBOPTIMAL:
+                logging.warning("Time limit reached, continue with best candidate.")
+            else:
+                logging.warning("Time limit reached, community search is incomplete.")
+                self.complete = False
+        return solution
+
+    def _solve_time_limit(self):
+        """Time limit of the next optimization or `None` if it is unlimited."""
+        limits = [self.milp_time_limit] if self.milp_time_limit else []
+        if self.deadline is not None:
+            limits.append(self.deadline - time.time())
+        return min(limits, default=None)
+
+    def _out_of_time(self) -> bool:
+        if self.deadline is None or time.time() < self.deadline:
+            return False
+        logging.warning("Time limit reached, community search is incomplete.")
+        self.complete = False
+        return True
 
     def _check_solution(self, solution):
         if solution.status != Status.OPTIMAL:
@@ -293,37 +803,151 @@ class Minimizer:
         )
         return True
 
-    def _add_knowledge_constraint(self, not_selected: dict):
-        constraint_name = f"c_tmp_{len(self.knowledge_constraints) + 1}"
-        self.community.solver.add_constraint(constraint_name, not_selected, ">", 1)
-        self.knowledge_constraints[constraint_name] = not_selected
+    def _community_constraint_name(self) -> str:
+        """Name of a new community constraint.
+
+        Names are never reused, as the pipelined search discards cuts and thereby
+        leaves gaps in the names of the community constraints of a cache file.
+        """
+        if self._next_community_constraint is None:
+            self._next_community_constraint = 1 + max(
+                (
+                    int(name[2:])
+                    for name in self.community_constraints
+                    if name[2:].isdigit()
+                ),
+                default=-1,
+            )
+        name = f"c_{self._next_community_constraint}"
+        self._next_community_constraint += 1
+        return name
 
-    def _load_constraints_from_cache(self, cache: dict):
-        for name, selected in cache["community_constraints"].items():
-            self.community.solver.add_constraint(name, selected, "<", len(selected) - 1)
-            self.community_constraints[name] = selected
+    def _add_community_constraint(
+        self, constraint_name: str, selected: int, record: bool = True
+    ):
+        self.community.solver.add_constraint(
+            constraint_name,
+            self._lhs(selected),
+            "<",
+            self._encoder.size(selected) - 1,
+        )
+        self.community_constraints[constraint_name] = selected
+        if record:
+            self._record(
+                {"type": "community", "name": constraint_name, "mask": selected}
+            )
 
-        for name, not_selected in cache["knowledge_constraints"].items():
-            self.community.solver.add_constraint(name, not_selected, ">", 1)
-            self.knowledge_constraints[name] = not_selected
+    def _add_knowledge_constraint(
+        self, not_selected: int, constraint_name: str = None, record: bool = True
+    ):
+        if constraint_name is None:
+            constraint_name = f"c_tmp_{len(self.knowledge_constraints) + 1}"
+        self.community.solver.add_constraint(
+            constraint_name, self._lhs(not_selected), ">", 1
+        )
+        self.knowledge_constraints[constraint_name] = not_selected
+        if record:
+            self._record(
+                {"type": "knowledge", "name": constraint_name, "mask": not_selected}
+            )
 
-        self.solutions = cache["solutions"]
+    def _record(self, record: dict):
+        """Append record to the cache journal and compact it when it has grown."""
+        if self._journal is None:
+            return
+        self._journal.append(record)
+        state_records = (
+            1
+            + len(self.community_constraints)
+            + len(self.knowledge_constraints)
+            + len(self._solution_index)
+        )
+        if self._journal.records > 2 * state_records + 1024:
+            self._journal.compact(self._cache_records())
+
+    def _load_constraints_from_cache(self, records: list):
+        """Replay the records of the cache journal."""
+        cache_encoder = self._encoder
+
+        def encode(mask):
+            # caches of previous versions store communities as dictionaries
+            if isinstance(mask, dict):
+                return self._encoder.encode(mask.keys())
+            return self._encoder.encode(cache_encoder.decode(mask))
+
+        for record in records:
+            if record["type"] == "header":
+                cache_encoder = MembershipEncoder(record["members"])
+            elif record["type"] == "community":
+                self._add_community_constraint(
+                    record["name"], encode(record["mask"]), record=False
+                )
+            elif record["type"] == "knowledge":
+                self._add_knowledge_constraint(
+                    encode(record["mask"]), record["name"], record=False
+                )
+            elif record["type"] == "solution":
+                self._retain_solution(encode(record["mask"]), record["solution"])
 
         self.community.solver.update()
 
-    def _dump_constraints_to_cache(self):
-        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-        with open(self.cache_file, "w", encoding="utf8") as cache_fd:
-            yaml.dump(
+    def _cache_records(self) -> list:
+        """Records of the current state for the cache journal."""
+        return (
+            [
                 {
-                    "community_constraints": self.community_constraints,
-                    "knowledge_constraints": self.knowledge_constraints,
-                    "solutions": self.solutions,
-                },
-                cache_fd,
-                Dumper=yaml.CSafeDumper,
-            )
+                    "type": "header",
+                    "format": JOURNAL_FORMAT,
+                    "members": self._encoder.members,
+                }
+            ]
+            + [
+                {"type": "community", "name": name, "mask": mask}
+                for name, mask in self.community_constraints.items()
+            ]
+            + [
+                {"type": "knowledge", "name": name, "mask": mask}
+                for name, mask in self.knowledge_constraints.items()
+            ]
+            + [
+                {"type": "solution", "mask": mask, "solution": community_solution}
+                for mask, community_solution in self._solution_index.items()
+            ]
+        )
+
+
+def _read_cache(cache_file: str) -> list:
+    """Read records from cache file.
+
+    Cache files of previous versions are YAML files with the complete state. They
+    are converted to records.
+    """
+    if CacheJournal.is_journal(cache_file):
+        return CacheJournal.read(cache_file)
+
+    with open(cache_file, encoding="utf8") as cache_fd:
+        cache = yaml.load(cache_fd, Loader=yaml.CSafeLoader)
+    records = []
+    if "members" in cache:
+        records.append({"type": "header", "members": cache["members"]})
+    records += [
+        {"type": "community", "name": name, "mask": mask}
+        for name, mask in cache["community_constraints"].items()
+    ]
+    records += [
+        {"type": "knowledge", "name": name, "mask": mask}
+        for name, mask in cache["knowledge_constraints"].items()
+    ]
+    records += [
+        {
+            "type": "solution",
+            "mask": solution["community"],
+            "solution": solution["solution"],
+        }
+        for solution in cache["solutions"]
+    ]
+    return records
 
 
-def _get_dict(solution, get_values):
-    return {k: v for k, v in solution.values.items() if v and k in get_values}
+def _get_dict(solution):
+    return {k: v for k, v in solution.values.items() if v}
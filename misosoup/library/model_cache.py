@@ -0,0 +1,57 @@
+"""Content addressed cache for parsed models."""
+import hashlib
+import os
+
+import reframed
+
+from .fileio import load_compressed_pickle, store_compressed_pickle
+
+CACHE_FORMAT = 1
+CHUNK_SIZE = 1 << 20
+
+
+def default_cache_dir():
+    """Default directory of the model cache."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "misosoup", "models")
+
+
+def file_digest(path):
+    """Compute sha256 digest of file content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file_descriptor:
+        for chunk in iter(lambda: file_descriptor.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(path, flavor="fbc2"):
+    """Cache key of model file.
+
+    The key depends on the file content, the sbml flavor, the `reframed` version and
+    the format of the cache, such that models are parsed again if any of them change.
+    """
+    digest = hashlib.sha256(
+        f"{file_digest(path)}:{flavor}:{reframed.__version__}:{CACHE_FORMAT}".encode()
+    )
+    return digest.hexdigest()
+
+
+def load_cached_model(cache_dir, key):
+    """Load model from cache. Returns `None` if the model is not cached."""
+    return load_compressed_pickle(
+        _cache_path(cache_dir, key), description="model cache entry"
+    )
+
+
+def store_cached_model(cache_dir, key, model):
+    """Store model in cache."""
+    store_compressed_pickle(
+        _cache_path(cache_dir, key), model, description="model cache entry"
+    )
+
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.pickle.z")
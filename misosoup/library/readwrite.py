@@ -1,4 +1,8 @@
 """Read and write utility functions."""
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
 import yaml
 
 import pandas as pd
@@ -6,10 +10,59 @@ import pandas as pd
 from reframed.io.sbml import load_cbmodel
 
 from .common import get_reaction_name
-
-
-def load_models(paths):
-    return [load_cbmodel(path, flavor="fbc2") for path in paths]
+from .model_cache import (
+    cache_key,
+    default_cache_dir,
+    load_cached_model,
+    store_cached_model,
+)
+
+
+def load_models(paths, workers=1, use_cache=True, cache_dir=None):
+    """Load models from sbml files in the order of `paths`.
+
+    Models are parsed in up to `workers` processes. With `use_cache`, parsed models
+    are loaded from and added to the model cache in `cache_dir`, which defaults to
+    `~/.cache/misosoup/models`.
+    """
+    if not use_cache:
+        cache_dir = None
+    elif cache_dir is None:
+        cache_dir = default_cache_dir()
+
+    if workers <= 1 or len(paths) <= 1:
+        return [_load_model(path, cache_dir) for path in paths]
+
+    logging.debug("Loading %i models with %i workers.", len(paths), workers)
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(paths)),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        futures = [executor.submit(_load_model, path, cache_dir) for path in paths]
+        try:
+            return [future.result() for future in futures]
+        except RuntimeError:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def _load_model(path, cache_dir=None):
+    try:
+        if cache_dir is None:
+            return load_cbmodel(path, flavor="fbc2")
+
+        key = cache_key(path, flavor="fbc2")
+        model = load_cached_model(cache_dir, key)
+        if model is None:
+            logging.debug("Parse model: %s", path)
+            model = load_cbmodel(path, flavor="fbc2")
+            store_cached_model(cache_dir, key, model)
+        else:
+            logging.debug("Load cached model: %s", path)
+        return model
+    except Exception as error:
+        raise RuntimeError(f"Unable to load model: {path}") from error
 
 
 def read_medium(path, medium_name):
@@ -0,0 +1,111 @@
+"""Scaling study of the community search over pool sizes."""
+import json
+import logging
+import os
+import random
+import subprocess
+import time
+
+import yaml
+
+from .metrics import rss_bytes
+
+
+def sample_models(paths: list, size: int, seed=None) -> list:
+    """Sample `size` models from `paths`, reproducibly for a given `seed`."""
+    return random.Random(seed).sample(sorted(paths), size)
+
+
+RUN_FILES = {
+    "output": "output.yaml",
+    "status": "status.yaml",
+    "metrics": "metrics.jsonl",
+    "events": "events.jsonl",
+}
+
+
+def run_misosoup(paths: list, media: str, directory: str, arguments=()) -> dict:
+    """Run `misosoup` on the models in `paths` and collect the statistics of the run.
+
+    The output, status, metrics, events and log of the run are written to
+    `directory`. Returns the exit code, wall time and peak memory of the run
+    together with the statistics of `read_run_statistics`.
+    """
+    os.makedirs(directory, exist_ok=True)
+    command = ["misosoup", *paths, "--media", media]
+    for option, file_name in RUN_FILES.items():
+        command += [f"--{option}", os.path.join(directory, file_name)]
+    command += arguments
+    logging.debug("Run: %s", " ".join(command))
+
+    start = time.perf_counter()
+    with open(os.path.join(directory, "misosoup.log"), "w", encoding="utf8") as log:
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 reports the resource usage of this child only
+        _, status, usage = os.wait4(process.pid, 0)
+    wall_time = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    return {
+        "returncode": process.returncode,
+        "wall_time": wall_time,
+        "peak_rss": rss_bytes(usage.ru_maxrss),
+        **read_run_statistics(directory),
+    }
+
+
+def read_run_statistics(directory: str) -> dict:
+    """Statistics of a finished run from the files of `run_misosoup` in `directory`.
+
+    The number of MILPs is the number of recorded `milp` phases and the number of
+    cuts is the number of community and knowledge constraints at the end of every
+    community search. Statistics of missing files are `None`.
+    """
+    paths = {
+        option: os.path.join(directory, file_name)
+        for option, file_name in RUN_FILES.items()
+    }
+    statistics = {"milps": None, "cuts": None, "solutions": None, "incomplete": None}
+
+    records = _read_json_lines(paths["metrics"])
+    if records is not None:
+        statistics["milps"] = sum(record.get("phase") == "milp" for record in records)
+
+    records = _read_json_lines(paths["events"])
+    if records is not None:
+        statistics["cuts"] = sum(
+            record["community_constraints"] + record["knowledge_constraints"]
+            for record in records
+            if record.get("event") == "search_done"
+        )
+
+    output = _read_yaml(paths["output"])
+    if output is not None:
+        statistics["solutions"] = sum(
+            "community" in solution
+            for strains in output.values()
+            for solutions in strains.values()
+            for solution in solutions
+        )
+
+    status = _read_yaml(paths["status"])
+    if status is not None:
+        statistics["incomplete"] = sum(
+            len(strains) for strains in status["incomplete"].values()
+        )
+
+    return statistics
+
+
+def _read_yaml(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf8") as file_descriptor:
+        return yaml.load(file_descriptor, Loader=yaml.CSafeLoader) or {}
+
+
+def _read_json_lines(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf8") as file_descriptor:
+        return [json.loads(line) for line in file_descriptor if line.strip()]
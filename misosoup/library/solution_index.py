@@ -0,0 +1,104 @@
+"""Index of community solutions by membership."""
+
+
+class SolutionIndex:
+    """Solutions indexed by the integer bitmask of their members.
+
+    Every solution occupies a slot. For each member, the index keeps a bitset of
+    the slots of the solutions it belongs to, such that supersets and subsets of a
+    community are found with a few operations on integers instead of comparing
+    against every solution.
+    """
+
+    def __init__(self):
+        self._masks = []
+        self._solutions = []
+        self._slots = 0
+        self._member_slots = {}
+
+    def __len__(self):
+        return bin(self._slots).count("1")
+
+    def solutions(self) -> list:
+        """Solutions in the order of their slots."""
+        return [
+            solution
+            for solution, mask in zip(self._solutions, self._masks)
+            if mask is not None
+        ]
+
+    def get(self, slot: int):
+        """Solution in `slot`."""
+        return self._solutions[slot]
+
+    def mask(self, slot: int) -> int:
+        """Membership of the solution in `slot`."""
+        return self._masks[slot]
+
+    def items(self) -> list:
+        """Membership and solution pairs in the order of their slots."""
+        return [
+            (mask, solution)
+            for solution, mask in zip(self._solutions, self._masks)
+            if mask is not None
+        ]
+
+    def add(self, mask: int, solution) -> int:
+        """Add solution with membership `mask` and return its slot."""
+        slot = len(self._masks)
+        self._masks.append(mask)
+        self._solutions.append(solution)
+        self._set(slot, mask)
+        return slot
+
+    def replace(self, slots: list, mask: int, solution) -> int:
+        """Replace the solutions in `slots` by a single solution in the first slot."""
+        slot, *removed = sorted(slots)
+        for old_slot in removed:
+            self.remove(old_slot)
+        self._unset(slot, self._masks[slot])
+        self._masks[slot] = mask
+        self._solutions[slot] = solution
+        self._set(slot, mask)
+        return slot
+
+    def remove(self, slot: int):
+        """Remove solution in `slot`."""
+        self._unset(slot, self._masks[slot])
+        self._masks[slot] = None
+        self._solutions[slot] = None
+
+    def supersets(self, mask: int) -> list:
+        """Slots of solutions that contain all members of `mask`."""
+        slots = self._slots
+        for bit in _bits(mask):
+            slots &= self._member_slots.get(bit, 0)
+            if not slots:
+                break
+        return list(_bits(slots))
+
+    def subsets(self, mask: int) -> list:
+        """Slots of solutions without members outside of `mask`."""
+        slots = self._slots
+        for bit, member_slots in self._member_slots.items():
+            if not mask >> bit & 1:
+                slots &= ~member_slots
+        return list(_bits(slots))
+
+    def _set(self, slot, mask):
+        self._slots |= 1 << slot
+        for bit in _bits(mask):
+            self._member_slots[bit] = self._member_slots.get(bit, 0) | 1 << slot
+
+    def _unset(self, slot, mask):
+        self._slots &= ~(1 << slot)
+        for bit in _bits(mask):
+            self._member_slots[bit] &= ~(1 << slot)
+
+
+def _bits(value: int):
+    """Positions of the set bits of `value`."""
+    while value:
+        lowest = value & -value
+        yield lowest.bit_length() - 1
+        value ^= lowest
@@ -0,0 +1,98 @@
+"""Synthetic community members derived from real models."""
+import logging
+import random
+
+from reframed import ReactionType
+from reframed.solvers.solution import Status
+
+from ..reframed.gurobi_env_solver import GurobiEnvSolver
+
+
+def synthesize_members(
+    models: list,
+    n_members: int,
+    knockouts: int = 10,
+    minimal_growth: float = 0.1,
+    uptake: float = 10,
+    seed=None,
+    env=None,
+) -> list:
+    """Create synthetic members by knocking out reactions of real models.
+
+    Member `i` is a copy of `models[i % len(models)]` with id `<model id>_<i>`, in
+    which up to `knockouts` random enzymatic reactions are blocked. A knockout is
+    only kept if the member still reaches `minimal_growth` with uptake rates of at
+    most `uptake`, such that knockouts become auxotrophies.
+    """
+    rng = random.Random(seed)
+    checks = [_GrowthCheck(model, minimal_growth, uptake, env) for model in models]
+    width = len(str(n_members - 1))
+
+    members = []
+    for index in range(n_members):
+        check = checks[index % len(checks)]
+        blocked = check.knockouts(rng, knockouts)
+        if len(blocked) < knockouts:
+            logging.warning(
+                "Only %i of %i knockouts are feasible for member %i of model %s",
+                len(blocked),
+                knockouts,
+                index,
+                check.model.id,
+            )
+
+        member = check.model.copy()
+        member.id = f"{check.model.id}_{index:0{width}d}"
+        for r_id in blocked:
+            member.set_flux_bounds(r_id, 0, 0)
+        members.append(member)
+        logging.debug("Synthesized member %s: %s", member.id, ", ".join(blocked))
+
+    return members
+
+
+class _GrowthCheck:
+    """Growth of a model under reaction knockouts."""
+
+    def __init__(self, model, minimal_growth, uptake, env):
+        self.model = model
+        self.minimal_growth = minimal_growth
+        self.solver = GurobiEnvSolver(model, env=env)
+        self.objective = {model.biomass_reaction: 1}
+        self.medium = {
+            r_id: (max(model.reactions[r_id].lb, -uptake), model.reactions[r_id].ub)
+            for r_id in model.get_exchange_reactions()
+        }
+        self.candidates = sorted(
+            r_id
+            for r_id in model.get_reactions_by_type(ReactionType.ENZYMATIC)
+            if r_id != model.biomass_reaction
+            and not (model.reactions[r_id].lb == 0 == model.reactions[r_id].ub)
+        )
+        if not self.grows(self.medium):
+            raise ValueError(
+                f"Model {model.id} does not reach growth rate {minimal_growth}."
+            )
+
+    def grows(self, constraints):
+        """Check if the model reaches the minimal growth rate."""
+        solution = self.solver.solve(
+            self.objective, minimize=False, constraints=constraints, get_values=False
+        )
+        return (
+            solution.status == Status.OPTIMAL and solution.fobj >= self.minimal_growth
+        )
+
+    def knockouts(self, rng, count):
+        """Draw up to `count` knockouts that keep the model growing."""
+        constraints = dict(self.medium)
+        blocked = []
+        for r_id in rng.sample(self.candidates, len(self.candidates)):
+            if len(blocked) == count:
+                break
+            constraints[r_id] = (0, 0)
+            if self.grows(constraints):
+                blocked.append(r_id)
+            else:
+                del constraints[r_id]
+        return blocked
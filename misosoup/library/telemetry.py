@@ -0,0 +1,38 @@
+"""Summaries of solver telemetry."""
+import math
+
+SUMMED_STATISTICS = ["runtime", "node_count", "iter_count"]
+
+
+def summarize_telemetry(statistics: list) -> dict:
+    """Summarize the statistics of several optimizations."""
+    summary = {"solves": len(statistics)}
+    for key in SUMMED_STATISTICS:
+        summary[key] = sum(entry.get(key) or 0 for entry in statistics)
+    # infeasible problems have an infinite gap
+    summary["max_mip_gap"] = max(
+        (
+            entry["mip_gap"]
+            for entry in statistics
+            if entry.get("mip_gap") is not None and math.isfinite(entry["mip_gap"])
+        ),
+        default=None,
+    )
+    return summary
+
+
+def merge_summaries(summaries: list) -> dict:
+    """Merge summaries of several runs into one summary."""
+    summary = {
+        key: sum(entry[key] for entry in summaries)
+        for key in ["solves"] + SUMMED_STATISTICS
+    }
+    summary["max_mip_gap"] = max(
+        (
+            entry["max_mip_gap"]
+            for entry in summaries
+            if entry["max_mip_gap"] is not None
+        ),
+        default=None,
+    )
+    return summary
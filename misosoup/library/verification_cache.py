@@ -0,0 +1,82 @@
+"""Cache for verification results of candidate communities."""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from .fileio import load_compressed_pickle, store_compressed_pickle
+
+CACHE_FORMAT = 1
+_MISSING = object()
+
+
+class VerificationCache:
+    """Least recently used cache of verification results.
+
+    Results are kept in memory and optionally stored in `cache_dir`, such that they
+    can be reused across runs. The `namespace` separates the results of different
+    model collections in the same directory.
+    """
+
+    def __init__(self, maxsize: int = 4096, cache_dir: str = "", namespace: str = ""):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.namespace = namespace
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, members: list, **settings) -> str:
+        """Cache key of candidate community with the settings of its verification."""
+        data = json.dumps(
+            [CACHE_FORMAT, self.namespace, sorted(members), settings],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def get(self, key: str):
+        """Get verification result.
+
+        Returns a tuple of whether the result is cached and the result itself, as
+        failed verifications are cached as `None`.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return True, self._entries[key]
+
+        if not self.cache_dir:
+            return False, None
+
+        result = load_compressed_pickle(
+            self._cache_path(key), _MISSING, "verification cache entry"
+        )
+        if result is _MISSING:
+            return False, None
+
+        self._remember(key, result)
+        return True, result
+
+    def put(self, key: str, result):
+        """Store verification result."""
+        self._remember(key, result)
+
+        if not self.cache_dir:
+            return
+
+        store_compressed_pickle(
+            self._cache_path(key), result, "verification cache entry"
+        )
+
+    def _remember(self, key, result):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pickle.z")
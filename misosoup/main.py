@@ -2,65 +2,308 @@
 
 import argparse
 import glob
+import hashlib
 import logging
+import multiprocessing
 import os
+import sys
 import textwrap
-from collections import defaultdict
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import quote
 
 import yaml
+from gurobipy import Env
 from reframed.solvers.solver import Parameter
 
+from .library.checkpoint import CheckpointStore
+from .library.events import EventLog
 from .library.getters import get_biomass, get_exchange_reactions
-from .library.minimizer import Minimizer
+from .library.metrics import MetricsRecorder
+from .library.minimizer import Enumeration, Minimizer, Verification
+from .library.model_cache import file_digest as model_file_digest
 from .library.readwrite import load_models, read_compounds
+from .library.telemetry import merge_summaries, summarize_telemetry
 from .library.validate import validate_solution_dict
-from .reframed.layered_community import LayeredCommunity
+from .library.verification_cache import VerificationCache
+from .reframed.layered_community import ENVIRONMENT_PARAMETERS, LayeredCommunity
 
 
 def main(args):
     """Main function."""
+    deadline = time.time() + args.time_limit if args.time_limit else None
+    metrics = MetricsRecorder(args.metrics)
+    metrics.reset()
+    EventLog(args.events).reset()
+
     logging.info("Loading models.")
     input_paths = glob.glob(args.input[0]) if len(args.input) == 1 else args.input
-    models = load_models(input_paths)
+    with metrics.phase("load_models", models=len(input_paths)):
+        models = load_models(
+            input_paths,
+            workers=args.load_workers,
+            use_cache=not args.no_model_cache,
+            cache_dir=args.model_cache_dir,
+        )
 
     logging.info("Loading media.")
     media = read_compounds(args.media)
     base_medium = media["base_medium"] if "base_medium" in media.keys() else {}
+    media = {
+        medium_id: {**medium_composition, **base_medium}
+        for medium_id, medium_composition in media.items()
+        if not medium_id == "base_medium"
+        and (not args.media_select or medium_id in args.media_select)
+    }
+
+    namespace = (
+        models_digest(input_paths)
+        if args.verification_cache or args.checkpoint_dir
+        else ""
+    )
+
+    failed = []
+    if args.jobs > 1:
+        results, failed = solve_media_parallel(args, models, media, namespace, deadline)
+    else:
+        logging.info("Construct community model.")
+        community = build_community(args, models)
+        verification_cache = build_verification_cache(args, namespace)
+        checkpoints = build_checkpoint_store(args, namespace)
+        results = {
+            medium_id: solve_medium(
+                args,
+                community,
+                medium_id,
+                medium,
+                verification_cache,
+                checkpoints,
+                deadline,
+                _medium_cache_file(args.cache_file, medium_id, len(media)),
+            )
+            for medium_id, medium in media.items()
+        }
 
-    solutions = defaultdict(dict)
+    incomplete = {
+        medium_id: strains for medium_id, (_, strains, _) in results.items() if strains
+    }
+    telemetry = {
+        medium_id: medium_telemetry
+        for medium_id, (_, _, medium_telemetry) in results.items()
+        if medium_telemetry is not None
+    }
+    output_dict = {
+        medium_id: {
+            org: sol if sol or org in strains else [{f"Growth_{org}": 0}]
+            for org, sol in solutions.items()
+        }
+        for medium_id, (solutions, strains, _) in results.items()
+    }
+
+    if args.validate:
+        validate_solution_dict(output_dict, args.exchange_format)
+
+    if incomplete:
+        logging.warning(
+            "Time limit reached, incomplete results for media: %s", list(incomplete)
+        )
+
+    if args.status:
+        status = {
+            "complete": not incomplete and not failed,
+            "incomplete": incomplete,
+            "failed": failed,
+        }
+        _write_file(args.status, yaml.dump(status, Dumper=yaml.CSafeDumper))
+
+    if telemetry:
+        run_summary = merge_summaries(
+            [medium_telemetry["summary"] for medium_telemetry in telemetry.values()]
+        )
+        logging.info(
+            "Solver summary: %i solves, %.2f s runtime, %i nodes, %i iterations.",
+            run_summary["solves"],
+            run_summary["runtime"],
+            run_summary["node_count"],
+            run_summary["iter_count"],
+        )
+        if args.telemetry:
+            _write_file(
+                args.telemetry,
+                yaml.dump(
+                    {"run": run_summary, "media": telemetry}, Dumper=yaml.CSafeDumper
+                ),
+            )
+
+    output = yaml.dump(output_dict, Dumper=yaml.CSafeDumper)
+
+    if args.output:
+        _write_file(args.output, output)
+    else:
+        print(output)
 
-    logging.info("Construct community model.")
-    community = LayeredCommunity(
+    if failed:
+        logging.error("Computation failed for media: %s", failed)
+        sys.exit(os.EX_SOFTWARE)
+
+
+def _write_file(path, content):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf8") as file_descriptor:
+        file_descriptor.write(content)
+
+
+def build_community(args, models, env=None):
+    """Build community model from models."""
+    with MetricsRecorder(args.metrics).phase("build_community") as fields:
+        community = _build_community(args, models, env)
+        fields.update(community.timings)
+        fields["num_vars"] = len(community.solver.variables)
+        fields["num_constrs"] = len(community.solver.constraints)
+    return community
+
+
+def _build_community(args, models, env):
+    params = {
+        Parameter.OPTIMALITY_TOL: args.tolerance,
+        Parameter.FEASIBILITY_TOL: args.tolerance,
+    }
+    if args.mip_gap is not None:
+        params[Parameter.MIP_REL_GAP] = args.mip_gap
+    return LayeredCommunity(
         "community",
         models,
+        env=env,
         copy_models=False,
-        params={
-            Parameter.OPTIMALITY_TOL: args.tolerance,
-            Parameter.FEASIBILITY_TOL: args.tolerance,
-        },
-    )
-
-    for medium_id, medium_composition in media.items():
-        if not medium_id == "base_medium" and (
-            not args.media_select or medium_id in args.media_select
-        ):
-            if args.objective:
-                logging.info("Set objective function.")
-                objective = {reaction: 1 for reaction in args.objective}
-            else:
-                logging.info("Set objective function to community biomass.")
-                objective = {community.merged_model.biomass_reaction: 1}
+        sparse=args.sparse,
+        params=params,
+    )
+
+
+def build_verification_cache(args, namespace=""):
+    """Build cache for verification results."""
+    return VerificationCache(cache_dir=args.verification_cache, namespace=namespace)
+
+
+# `sparse` is left out, it only changes how the community model is assembled and
+# yields the same optimization problem.
+SEARCH_SETTINGS = [
+    "parsimony",
+    "parsimony_only",
+    "objective",
+    "community_size",
+    "minimal_growth",
+    "tolerance",
+    "verification",
+]
+
+
+def build_checkpoint_store(args, namespace):
+    """Build checkpoint store if a checkpoint directory is given.
+
+    Checkpoints are only reused by runs with the same search settings.
+    """
+    if not args.checkpoint_dir:
+        return None
+    settings = {key: getattr(args, key) for key in SEARCH_SETTINGS}
+    return CheckpointStore(args.checkpoint_dir, namespace, settings)
+
+
+def models_digest(input_paths):
+    """Digest of the content of all model files."""
+    digest = hashlib.sha256()
+    for file_digest in sorted(map(model_file_digest, input_paths)):
+        digest.update(file_digest.encode())
+    return digest.hexdigest()
+
+
+def solve_medium(
+    args,
+    community,
+    medium_id,
+    medium,
+    verification_cache=None,
+    checkpoints=None,
+    deadline=None,
+    cache_file="",
+):
+    """Compute minimal communities of all focal strains for medium.
+
+    With a `cache_file`, the progress of the search of every focal strain is
+    recorded in it, suffixed with the strain if there are several. With a
+    checkpoint store, finished focal strains are not computed again and
+    unfinished ones continue from their journal.
+
+    Returns the solutions of each focal strain, the focal strains whose search
+    was stopped by the time limit and, with telemetry, a summary of the solver
+    statistics of the community problem together with the statistics of the
+    optimizations that found the solutions of each focal strain.
+    """
+    metrics = MetricsRecorder(args.metrics, medium=medium_id)
+    events = EventLog(args.events, medium=medium_id)
+    start = time.perf_counter()
+    if args.telemetry or args.solver_log_dir:
+        log_file = ""
+        if args.solver_log_dir:
+            os.makedirs(args.solver_log_dir, exist_ok=True)
+            log_file = os.path.join(
+                args.solver_log_dir, quote(str(medium_id), safe="") + ".log"
+            )
+        community.solver.enable_telemetry(log_file)
+    if args.medium_time_limit:
+        medium_deadline = time.time() + args.medium_time_limit
+        deadline = (
+            medium_deadline if deadline is None else min(deadline, medium_deadline)
+        )
+
+    if args.objective:
+        logging.info("Set objective function.")
+        objective = {reaction: 1 for reaction in args.objective}
+    else:
+        logging.info("Set objective function to community biomass.")
+        objective = {community.merged_model.biomass_reaction: 1}
+
+    strains = list(community.organisms.keys()) if "all" in args.strain else args.strain
+
+    solutions = {}
+    solution_telemetry = {}
+    incomplete = []
+    with metrics.phase("medium", strains=len(strains)) as medium_fields:
+        for strain in strains:
+            strain_cache_file = _strain_cache_file(cache_file, strain, len(strains))
+            if checkpoints is not None:
+                done = checkpoints.load_done(medium_id, medium, strain)
+                if done is not None:
+                    logging.info(
+                        "Skip finished strain %s in medium with id: %s",
+                        strain,
+                        medium_id,
+                    )
+                    solutions[strain] = done
+                    continue
+                strain_cache_file = checkpoints.journal_path(medium_id, medium, strain)
+
+            if deadline is not None and time.time() >= deadline:
+                logging.warning(
+                    "Time limit reached, skip strain %s in medium with id: %s",
+                    strain,
+                    medium_id,
+                )
+                solutions[strain] = []
+                incomplete.append(strain)
+                continue
 
             logging.info(
-                "Compute minimal communities for medium with id: %s", medium_id
+                "Compute communities for strain %s in medium with id: %s",
+                strain,
+                medium_id,
             )
-            medium = {
-                **medium_composition,
-                **base_medium,
-            }
 
             minimizer = Minimizer(
-                org_id=args.strain,
+                org_id=strain,
                 medium=medium,
                 community=community,
                 values=(
@@ -72,31 +315,183 @@ def main(args):
                 parsimony=args.parsimony,
                 parsimony_only=args.parsimony_only,
                 minimal_growth=args.minimal_growth,
-                cache_file=args.cache_file,
+                cache_file=strain_cache_file,
+                verification=Verification(args.verification),
+                solution_pool=args.solution_pool,
+                enumeration=Enumeration(args.enumeration),
+                verification_workers=args.verification_workers,
+                verification_cache=verification_cache,
+                deadline=deadline,
+                milp_time_limit=args.milp_time_limit,
+                metrics=metrics.bind(strain=strain),
+                on_event=events.bind(strain=strain) if events.enabled else None,
             )
 
-            solution = minimizer.minimize()
+            with minimizer.metrics.phase("minimize") as fields:
+                solutions[strain] = minimizer.minimize()
+                fields["solutions"] = len(solutions[strain])
+                fields["complete"] = minimizer.complete
+            if minimizer.solution_telemetry:
+                solution_telemetry[strain] = minimizer.solution_telemetry
 
-            solutions[medium_id][args.strain] = solution
+            if not minimizer.complete:
+                incomplete.append(strain)
+            elif checkpoints is not None:
+                checkpoints.mark_done(medium_id, medium, strain, solutions[strain])
 
-    output_dict = {
-        k: {org: sol if sol else [{f"Growth_{org}": 0}] for org, sol in v.items()}
-        for k, v in solutions.items()
-    }
+        medium_fields["incomplete"] = len(incomplete)
 
-    if args.validate:
-        validate_solution_dict(output_dict, args.exchange_format)
+    events(
+        {
+            "event": "medium_done",
+            "elapsed": time.perf_counter() - start,
+            "strains": len(strains),
+            "incomplete": incomplete,
+        }
+    )
 
-    output = yaml.dump(output_dict, Dumper=yaml.CSafeDumper)
+    telemetry = None
+    if community.solver.telemetry is not None:
+        telemetry = {
+            "summary": summarize_telemetry(community.solver.telemetry),
+            "solutions": solution_telemetry,
+        }
 
-    if args.output:
-        directory = os.path.dirname(args.output)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory, exist_ok=True)
-        with open(args.output, "w", encoding="utf8") as file_descriptor:
-            file_descriptor.write(output)
-    else:
-        print(output)
+    return solutions, incomplete, telemetry
+
+
+def _medium_cache_file(cache_file, medium_id, n_media):
+    if not cache_file or n_media == 1:
+        return cache_file
+    root, ext = os.path.splitext(cache_file)
+    return f"{root}_{quote(str(medium_id), safe='')}{ext}"
+
+
+def _strain_cache_file(cache_file, strain, n_strains):
+    if not cache_file or n_strains == 1:
+        return cache_file
+    root, ext = os.path.splitext(cache_file)
+    return f"{root}_{strain}{ext}"
+
+
+def solve_media_parallel(args, models, media, namespace="", deadline=None):
+    """Compute minimal communities for each medium in a separate worker process.
+
+    Each worker builds its own community model in its own gurobi environment. If a
+    worker process crashes, the media that were not completed are computed again in
+    isolated processes, such that a single medium can not abort the others.
+
+    Returns the results of the computed media and the ids of the failed media.
+    """
+    threads = args.threads_per_job or max(1, (os.cpu_count() or 1) // args.jobs)
+    logging.info(
+        "Compute %i media with %i jobs and %i threads per job.",
+        len(media),
+        args.jobs,
+        threads,
+    )
+
+    results = {}
+    with ProcessPoolExecutor(
+        max_workers=min(args.jobs, len(media)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(args, models, threads, namespace),
+    ) as executor:
+        futures = {
+            executor.submit(
+                _solve_medium_in_worker,
+                medium_id,
+                medium,
+                deadline,
+                _medium_cache_file(args.cache_file, medium_id, len(media)),
+            ): medium_id
+            for medium_id, medium in media.items()
+        }
+        broken, failed = _collect_media_solutions(futures, results)
+
+    if broken:
+        logging.warning("Worker crashed. Retry %i media in isolation.", len(broken))
+        with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+            futures = {
+                executor.submit(
+                    _solve_medium_isolated,
+                    args,
+                    models,
+                    threads,
+                    namespace,
+                    medium_id,
+                    medium,
+                    deadline,
+                    _medium_cache_file(args.cache_file, medium_id, len(media)),
+                ): medium_id
+                for medium_id, medium in media.items()
+                if medium_id in broken
+            }
+            crashed, retry_failed = _collect_media_solutions(futures, results)
+            for medium_id in crashed:
+                logging.error("Worker crashed for medium with id: %s", medium_id)
+            failed += crashed + retry_failed
+
+    return results, [medium_id for medium_id in media if medium_id in failed]
+
+
+def _collect_media_solutions(futures, results):
+    """Collect results of media and return the crashed and failed media."""
+    broken = []
+    failed = []
+    for future in as_completed(futures):
+        medium_id = futures[future]
+        try:
+            results[medium_id] = future.result()
+        except BrokenProcessPool:
+            broken.append(medium_id)
+        except Exception:  # pylint: disable=broad-except
+            logging.exception("Computation failed for medium with id: %s", medium_id)
+            failed.append(medium_id)
+    return broken, failed
+
+
+_WORKER_STATE = {}
+
+
+def _init_worker(args, models, threads, namespace):
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(message)s",
+    )
+    env = Env(params={**ENVIRONMENT_PARAMETERS, "Threads": threads})
+    _WORKER_STATE["args"] = args
+    _WORKER_STATE["community"] = build_community(args, models, env=env)
+    _WORKER_STATE["verification_cache"] = build_verification_cache(args, namespace)
+    _WORKER_STATE["checkpoints"] = build_checkpoint_store(args, namespace)
+
+
+def _solve_medium_in_worker(medium_id, medium, deadline=None, cache_file=""):
+    return solve_medium(
+        _WORKER_STATE["args"],
+        _WORKER_STATE["community"],
+        medium_id,
+        medium,
+        _WORKER_STATE["verification_cache"],
+        _WORKER_STATE["checkpoints"],
+        deadline,
+        cache_file,
+    )
+
+
+def _solve_medium_isolated(
+    args, models, threads, namespace, medium_id, medium, deadline=None, cache_file=""
+):
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(args, models, threads, namespace),
+    ) as executor:
+        return executor.submit(
+            _solve_medium_in_worker, medium_id, medium, deadline, cache_file
+        ).result()
 
 
 def entry():
@@ -133,13 +528,145 @@ def entry():
         type=str,
         help="Path to output file. Format: YAML. If not supplied, will print to stdout.",
     )
+    parser.add_argument(
+        "--status",
+        type=str,
+        default="",
+        help=(
+            "Path to status file. Format: YAML. If set, records whether the run is "
+            "complete, the strains of each medium whose search was stopped by a "
+            "time limit and the media whose computation failed."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help=(
+            "Number of media that are computed in parallel. Each medium is computed "
+            "in a separate worker process. Default: 1."
+        ),
+    )
+    parser.add_argument(
+        "--threads-per-job",
+        type=int,
+        default=0,
+        help=(
+            "Number of threads gurobi may use in each job. By default the available "
+            "cores are divided evenly between jobs."
+        ),
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        type=str,
+        default="",
+        help=(
+            "Directory to store checkpoints for each medium and focal strain. A run "
+            "with the same models skips finished media and strains and resumes "
+            "unfinished ones."
+        ),
+    )
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        default="",
+        help=(
+            "Path to metrics file. Format: JSON lines. If set, the wall time, solver "
+            "statistics and peak memory of each phase and optimization are recorded."
+        ),
+    )
+    parser.add_argument(
+        "--events",
+        type=str,
+        default="",
+        help=(
+            "Path to event log. Format: JSON lines. If set, progress events of the "
+            "community search, such as candidates, verifications, cuts and solutions, "
+            "are logged as they happen."
+        ),
+    )
+    parser.add_argument(
+        "--telemetry",
+        type=str,
+        default="",
+        help=(
+            "Path to telemetry file. Format: YAML. If set, solver statistics of the "
+            "community problem are recorded. The file contains a summary for the run "
+            "and each medium and the statistics of the optimizations that found the "
+            "solutions."
+        ),
+    )
+    parser.add_argument(
+        "--solver-log-dir",
+        type=str,
+        default="",
+        help=(
+            "Directory to store the gurobi log of the community problem for each "
+            "medium."
+        ),
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=0,
+        help=(
+            "Time limit of the run in seconds. Once reached, the solutions found so "
+            "far are reported and the unfinished media and strains are listed in "
+            "the status file. Default: unlimited."
+        ),
+    )
+    parser.add_argument(
+        "--medium-time-limit",
+        type=float,
+        default=0,
+        help="Time limit for each medium in seconds. Default: unlimited.",
+    )
+    parser.add_argument(
+        "--milp-time-limit",
+        type=float,
+        default=0,
+        help=(
+            "Time limit for each optimization of the community problem in seconds. "
+            "If reached, the best community found so far is used as candidate. "
+            "Default: unlimited."
+        ),
+    )
+    parser.add_argument(
+        "--mip-gap",
+        type=float,
+        help=(
+            "Relative MIP gap of the community problem (see gurobi documentation). "
+            "Default: gurobi default."
+        ),
+    )
+    parser.add_argument(
+        "--load-workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to load the models. Default: 1.",
+    )
+    parser.add_argument(
+        "--model-cache-dir",
+        type=str,
+        help=(
+            "Directory of the model cache. Parsed models are stored in the cache and "
+            "loaded from it as long as the model files do not change. "
+            "Default: ~/.cache/misosoup/models."
+        ),
+    )
+    parser.add_argument(
+        "--no-model-cache",
+        action="store_true",
+        help="Always parse models from their files and do not use the model cache.",
+    )
     parser.add_argument(
         "--cache-file",
         type=str,
         help=(
             "Path to cache file. If set, a file will be created to store intermediate "
             "solutions and the run can be interrupted and restored from this file at "
-            "any time."
+            "any time. With several media, the file is suffixed with the medium id."
         ),
     )
     parser.add_argument(
@@ -160,8 +687,12 @@ def entry():
     parser.add_argument(
         "--strain",
         type=str,
-        default="min",
-        help="Focal strain model id. If not provided, we compute minimal communities.",
+        nargs="+",
+        default=["min"],
+        help=(
+            "Focal strain model ids. Use `all` to compute communities for every "
+            "strain. If not provided, we compute minimal communities."
+        ),
     )
     parser.add_argument(
         "--parsimony",
@@ -204,6 +735,66 @@ def entry():
             "the community biomass is maximized."
         ),
     )
+    parser.add_argument(
+        "--verification",
+        type=str,
+        choices=[verification.value for verification in Verification],
+        default=Verification.REBUILD.value,
+        help=(
+            "Verification of candidate communities. `rebuild` builds a new community "
+            "model for each candidate, `restrict` fixes the members of the candidate "
+            "on a copy of the community problem. Default: rebuild."
+        ),
+    )
+    parser.add_argument(
+        "--verification-cache",
+        type=str,
+        default="",
+        help=(
+            "Directory to store verification results of candidate communities, "
+            "such that they can be reused in later runs."
+        ),
+    )
+    parser.add_argument(
+        "--verification-workers",
+        type=int,
+        default=0,
+        help=(
+            "Verify candidate communities in VERIFICATION_WORKERS threads while the "
+            "community search continues. Default: verify candidates one at a time."
+        ),
+    )
+    parser.add_argument(
+        "--enumeration",
+        type=str,
+        choices=[enumeration.value for enumeration in Enumeration],
+        default=Enumeration.ITERATIVE.value,
+        help=(
+            "Strategy to enumerate candidate communities. `iterative` solves the "
+            "problem again after each candidate, `lazy` rejects candidates with lazy "
+            "constraints during a single optimization, `layered` finds all "
+            "communities of one size before raising the size limit by one. "
+            "Default: iterative."
+        ),
+    )
+    parser.add_argument(
+        "--solution-pool",
+        type=int,
+        default=0,
+        help=(
+            "Collect up to SOLUTION_POOL communities of minimal size from each "
+            "optimization with the gurobi solution pool. Default: disabled."
+        ),
+    )
+    parser.add_argument(
+        "--sparse",
+        action="store_true",
+        help=(
+            "Assemble the community model from sparse arrays instead of individual "
+            "reaction and metabolite objects. Reduces construction time and memory "
+            "usage for large communities."
+        ),
+    )
     parser.add_argument(
         "--validate",
         action="store_true",
@@ -215,6 +806,8 @@ def entry():
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output.")
 
     args_parsed = parser.parse_args()
+    if args_parsed.cache_file and args_parsed.checkpoint_dir:
+        parser.error("argument --cache-file: not allowed with --checkpoint-dir")
 
     verbosity = logging.DEBUG if args_parsed.verbose else logging.INFO
     logging.basicConfig(level=verbosity, format="%(asctime)s %(message)s")
@@ -1,14 +1,37 @@
 """Gurobi solver instance for individual environments."""
 
+import copy
+
+import numpy as np
+from gurobipy import GRB, GurobiError, LinExpr
 from gurobipy import Model as GurobiModel
-from reframed.solvers.gurobi_solver import GurobiSolver
-from reframed.solvers.solver import Parameter, Solver
+from reframed.solvers.gurobi_solver import (
+    GurobiSolver,
+    infinity_fix,
+    sense_mapping,
+    status_mapping,
+    vartype_mapping,
+)
+from reframed.solvers.solution import Solution, Status
+from reframed.solvers.solver import Parameter, Solver, VarType
+from scipy.sparse import csr_matrix
+
+from .sparse_model import SparseCommunityModel
 
 default_parameters = {
     Parameter.OPTIMALITY_TOL: 1e-6,
     Parameter.FEASIBILITY_TOL: 1e-6,
 }
 
+STATISTICS_ATTRIBUTES = {
+    "runtime": "Runtime",
+    "node_count": "NodeCount",
+    "iter_count": "IterCount",
+    "mip_gap": "MIPGap",
+    "num_vars": "NumVars",
+    "num_constrs": "NumConstrs",
+}
+
 
 class GurobiEnvSolver(GurobiSolver):
     """Gurobi interface initialized in gurobi environment."""
@@ -17,6 +40,10 @@ class GurobiEnvSolver(GurobiSolver):
         """Init GurobiEnvSolver."""
         Solver.__init__(self)
         self.problem = GurobiModel(env=env)
+        self._variable_index = {}
+        self._variable_list = []
+        self.telemetry = None
+        self._presolve = {}
 
         for par, value in default_parameters.items():
             self.set_parameter(par, value)
@@ -28,3 +55,345 @@ class GurobiEnvSolver(GurobiSolver):
 
         if model:
             self.build_problem(model)
+
+    def build_problem(self, model):
+        """Create problem structure for a given model."""
+        if not isinstance(model, SparseCommunityModel):
+            super().build_problem(model)
+            return
+
+        self.update()
+
+        variables = self.problem.addMVar(
+            len(model.reaction_ids),
+            lb=_infinity_fix_array(model.lb),
+            ub=_infinity_fix_array(model.ub),
+            name=np.array(model.reaction_ids),
+        )
+        self.problem.addMConstr(
+            model.stoichiometry.tocsr(),
+            variables,
+            GRB.EQUAL,
+            np.zeros(len(model.metabolite_ids)),
+            name=model.metabolite_ids,
+        )
+        self.variables.extend(model.reaction_ids)
+        self.constraints.extend(model.metabolite_ids)
+        self.problem.update()
+
+    def add_variables_bulk(self, var_ids, lb, ub, vartype=VarType.CONTINUOUS):
+        """Add variables in bulk.
+
+        Arguments:
+            var_ids (list): variable identifiers
+            lb (float or list): lower bounds
+            ub (float or list): upper bounds
+            vartype (VarType): variable type (default: CONTINUOUS)
+        """
+        self.update()
+        if not var_ids:
+            return
+
+        self.problem.addMVar(
+            len(var_ids),
+            lb=_infinity_fix_array(lb),
+            ub=_infinity_fix_array(ub),
+            vtype=vartype_mapping[vartype],
+            name=np.array(var_ids),
+        )
+        self.variables.extend(var_ids)
+        self.problem.update()
+
+    def add_constraints_bulk(self, constr_ids, lhs, sense, rhs):
+        """Add linear constraints in bulk.
+
+        All constraints are added with a single sparse constraint matrix.
+
+        Arguments:
+            constr_ids (list): constraint identifiers
+            lhs (list): variables and respective coefficients for each constraint
+            sense (str or list): constraint senses (any of: '<', '=', '>')
+            rhs (float or list): right-hand sides
+        """
+        self.update()
+        if not constr_ids:
+            return
+
+        index = self._get_variable_index()
+        rows, cols, coeffs = [], [], []
+        for row, constraint in enumerate(lhs):
+            for var_id, coeff in constraint.items():
+                if coeff:
+                    rows.append(row)
+                    cols.append(index[var_id])
+                    coeffs.append(coeff)
+
+        matrix = csr_matrix(
+            (coeffs, (rows, cols)), shape=(len(constr_ids), len(index)), dtype=float
+        )
+        self.problem.addMConstr(
+            matrix,
+            None,
+            sense if isinstance(sense, str) else np.array(sense),
+            np.broadcast_to(np.asarray(rhs, dtype=float), len(constr_ids)),
+            name=list(constr_ids),
+        )
+        self.constraints.extend(constr_ids)
+        self.problem.update()
+
+    def set_bounds(self, bounds):
+        """Set variable bounds in bulk.
+
+        Arguments:
+            bounds (dict): lower and upper bound for each variable
+        """
+        self.update()
+        variables = [self.problem.getVarByName(var_id) for var_id in bounds]
+        self.problem.setAttr(
+            "LB", variables, [infinity_fix(lb) for lb, _ in bounds.values()]
+        )
+        self.problem.setAttr(
+            "UB", variables, [infinity_fix(ub) for _, ub in bounds.values()]
+        )
+        self.problem.update()
+
+    def set_rhs(self, rhs):
+        """Set right-hand sides of constraints in bulk.
+
+        Arguments:
+            rhs (dict): right-hand side for each constraint
+        """
+        self.update()
+        constraints = [self.problem.getConstrByName(constr_id) for constr_id in rhs]
+        self.problem.setAttr("RHS", constraints, list(rhs.values()))
+        self.problem.update()
+
+    def set_variable_types(self, var_ids, vartype):
+        """Change the type of variables.
+
+        Arguments:
+            var_ids (list): variable identifiers
+            vartype (VarType): variable type
+        """
+        self.update()
+        variables = [self.problem.getVarByName(var_id) for var_id in var_ids]
+        self.problem.setAttr(
+            "VType", variables, [vartype_mapping[vartype]] * len(variables)
+        )
+        self.problem.update()
+
+    def set_solution_pool(self, size):
+        """Collect up to `size` optimal solutions in the solution pool.
+
+        Only solutions with the optimal objective value are retained in the pool.
+
+        Arguments:
+            size (int): maximal number of solutions in the pool, `None` to restore
+                the default pool
+        """
+        if size is None:
+            for name in ("PoolSearchMode", "PoolSolutions", "PoolGap"):
+                _, _, value, _, _, default = self.problem.getParamInfo(name)
+                if value != default:
+                    self.problem.setParam(name, default)
+            return
+        self.problem.setParam("PoolSearchMode", 2)
+        self.problem.setParam("PoolSolutions", size)
+        self.problem.setParam("PoolGap", 0)
+
+    def set_time_limit(self, seconds):
+        """Limit the time of the following optimizations.
+
+        Arguments:
+            seconds (float): time limit in seconds, `None` to remove the limit
+        """
+        time_limit = GRB.INFINITY if seconds is None else max(seconds, 0)
+        if self.problem.Params.TimeLimit != time_limit:
+            self.problem.setParam("TimeLimit", time_limit)
+
+    @property
+    def time_limit_reached(self):
+        """Whether the last optimization stopped at the time limit."""
+        return self.problem.Status == GRB.TIME_LIMIT
+
+    def internal_solve(self):
+        """Solve problem.
+
+        If the time limit is reached after a feasible solution was found, the
+        status is `SUBOPTIMAL` such that the solution can be retrieved.
+        """
+        if self.telemetry is None:
+            self.problem.optimize()
+        else:
+            self._presolve = {}
+            self.problem.optimize(self._telemetry_callback)
+            self.telemetry.append(self.statistics())
+
+        if self.time_limit_reached and self.problem.SolCount:
+            return Status.SUBOPTIMAL
+        return status_mapping.get(self.problem.Status, Status.UNKNOWN)
+
+    def enable_telemetry(self, log_file=""):
+        """Record the statistics of every following optimization in `telemetry`.
+
+        The statistics additionally contain the size of the presolved problem.
+        Previously recorded statistics are discarded.
+
+        Arguments:
+            log_file (str): path of the gurobi log file (default: no log file)
+        """
+        self.telemetry = []
+        self.problem.setParam("LogFile", log_file)
+
+    def statistics(self):
+        """Statistics of the last optimization.
+
+        Statistics that are not available for the problem, such as the MIP gap of
+        linear problems, are `None`. The size of the presolved problem is only
+        available with telemetry.
+        """
+        statistics = {}
+        for key, attribute in STATISTICS_ATTRIBUTES.items():
+            try:
+                statistics[key] = self.problem.getAttr(attribute)
+            except (AttributeError, GurobiError):
+                statistics[key] = None
+
+        statistics["presolved_rows"] = None
+        statistics["presolved_cols"] = None
+        if self._presolve:
+            statistics["presolved_rows"] = (
+                statistics["num_constrs"] - self._presolve["rows_removed"]
+            )
+            statistics["presolved_cols"] = (
+                statistics["num_vars"] - self._presolve["cols_removed"]
+            )
+        return statistics
+
+    def _telemetry_callback(self, problem, where):
+        if where == GRB.Callback.PRESOLVE:
+            self._presolve = {
+                "rows_removed": problem.cbGet(GRB.Callback.PRE_ROWDEL),
+                "cols_removed": problem.cbGet(GRB.Callback.PRE_COLDEL),
+            }
+
+    def get_pool_values(self, var_ids):
+        """Get variable values of all solutions in the solution pool.
+
+        Arguments:
+            var_ids (list): variable identifiers
+
+        Returns:
+            list: variable values of each solution, starting with the best solution
+        """
+        variables = [self.problem.getVarByName(var_id) for var_id in var_ids]
+        pool = []
+        for solution_number in range(self.problem.SolCount):
+            self.problem.setParam("SolutionNumber", solution_number)
+            pool.append(dict(zip(var_ids, self.problem.getAttr("Xn", variables))))
+        return pool
+
+    def solve_lazy(self, objective, var_ids, callback, minimize=True):
+        """Solve problem and reject incumbent solutions with lazy constraints.
+
+        The callback is called with the values of `var_ids` of every new incumbent
+        solution. It returns a list of constraints `(lhs, sense, rhs)` over `var_ids`
+        that are added as lazy constraints. The incumbent is accepted if the list is
+        empty.
+
+        Arguments:
+            objective (dict): linear objective
+            var_ids (list): variable identifiers passed to the callback
+            callback (function): callback returning lazy constraints
+            minimize (bool): solve a minimization problem (default: True)
+
+        Returns:
+            Status: status of the optimization
+        """
+        self.update()
+        self.set_objective(objective, minimize)
+        variables = dict(
+            zip(var_ids, [self.problem.getVarByName(var_id) for var_id in var_ids])
+        )
+        errors = []
+
+        def _callback(problem, where):
+            if self.telemetry is not None:
+                self._telemetry_callback(problem, where)
+            if where != GRB.Callback.MIPSOL:
+                return
+            try:
+                values = problem.cbGetSolution(list(variables.values()))
+                for lhs, sense, rhs in callback(dict(zip(var_ids, values))):
+                    expr = LinExpr(
+                        list(lhs.values()), [variables[var_id] for var_id in lhs]
+                    )
+                    problem.cbLazy(expr, sense_mapping[sense], rhs)
+            except Exception as error:  # pylint: disable=broad-except
+                errors.append(error)
+                problem.terminate()
+
+        self.problem.setParam("LazyConstraints", 1)
+        self._presolve = {}
+        try:
+            self.problem.optimize(_callback)
+        finally:
+            self.problem.setParam("LazyConstraints", 0)
+
+        if self.telemetry is not None:
+            self.telemetry.append(self.statistics())
+
+        if errors:
+            raise errors[0]
+
+        return status_mapping.get(self.problem.status, Status.UNKNOWN)
+
+    def copy(self, env=None):
+        """Copy solver with the current problem.
+
+        Arguments:
+            env (Env): gurobi environment of the copy (default: same environment)
+        """
+        self.update()
+        solver = copy.copy(self)
+        solver.problem = self.problem.copy(env=env)
+        solver.variables = list(self.variables)
+        solver.constraints = list(self.constraints)
+        solver._cached_vars = {}
+        solver._cached_constrs = {}
+        solver._variable_index = {}
+        solver._variable_list = []
+        if solver.telemetry is not None:
+            solver.telemetry = None
+            solver.problem.setParam("LogFile", "")
+        return solver
+
+    def get_solution(
+        self, status, get_values=True, shadow_prices=False, reduced_costs=False
+    ):
+        """Get solution and retrieve the values of variables in bulk."""
+        if not get_values or shadow_prices or reduced_costs:
+            return super().get_solution(
+                status, get_values, shadow_prices, reduced_costs
+            )
+
+        var_ids = self.variables if get_values is True else get_values
+        values = self.problem.getAttr("X", self._get_variables(var_ids))
+        return Solution(
+            status, fobj=self.problem.ObjVal, values=dict(zip(var_ids, values))
+        )
+
+    def _get_variable_index(self):
+        if len(self._variable_index) != self.problem.NumVars:
+            self._variable_list = self.problem.getVars()
+            names = self.problem.getAttr("VarName", self._variable_list)
+            self._variable_index = {name: i for i, name in enumerate(names)}
+        return self._variable_index
+
+    def _get_variables(self, var_ids):
+        index = self._get_variable_index()
+        return [self._variable_list[index[var_id]] for var_id in var_ids]
+
+
+def _infinity_fix_array(values):
+    return np.clip(np.asarray(values, dtype=float), -GRB.INFINITY, GRB.INFINITY)
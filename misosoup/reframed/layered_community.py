@@ -1,7 +1,10 @@
 """Layered community class implementation."""
 
+import copy
 import logging
 import math
+import time
+from contextlib import contextmanager
 
 from gurobipy import Env
 from reframed import (
@@ -18,14 +21,16 @@ from reframed import (
 from reframed.solvers.solver import VarType
 
 from ..reframed.gurobi_env_solver import GurobiEnvSolver
+from ..reframed.sparse_model import MemberIdMap, SparseModelBuilder
 
 BOUND_INF = 1000
+ENVIRONMENT_PARAMETERS = {"LogToConsole": 0, "Method": 1}
 
 
 class LayeredCommunity(Community):
     """Community model with additional layer of exchange reactions for each member."""
 
-    default_environment = Env(params={"LogToConsole": 0, "Method": 1})
+    default_environment = Env(params=ENVIRONMENT_PARAMETERS)
 
     def __init__(
         self,
@@ -35,6 +40,7 @@ class LayeredCommunity(Community):
         copy_models=False,
         suffix="_i",
         params=None,
+        sparse=False,
     ):
         super().__init__(
             community_id=community_id,
@@ -45,11 +51,29 @@ class LayeredCommunity(Community):
         if env is None:
             env = self.default_environment
 
+        self.env = env
         self.suffix = suffix
-        self.solver = GurobiEnvSolver(model=self.merged_model, env=env, params=params)
+        self.sparse = sparse
+        self.timings = {}
+
+        start = time.perf_counter()
+        merged_model = self.merged_model
+        self.timings["merge_models"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.solver = GurobiEnvSolver(model=merged_model, env=env, params=params)
+        self.timings["build_problem"] = time.perf_counter() - start
+
         self.has_binary_variables = False
+        self.has_medium = False
+        self.focal_constraint = None
+        self.parsimony_objective = {}
+        self._existing_values = {}
 
     def merge_models(self):
+        if self.sparse:
+            return self.merge_models_sparse()
+
         comm_model = CBModel(self.id)
         old_ext_comps = []
         ext_mets = []
@@ -195,18 +219,117 @@ class LayeredCommunity(Community):
 
         return comm_model
 
-    def setup_binary_variables(self, minimal_growth):
-        """Setup binary variables for each organism."""
-        for org_id in self.organisms.keys():
-            self.solver.add_variable(
-                f"y_{org_id}",
-                0,
-                1,
-                vartype=VarType.BINARY,
+    def merge_models_sparse(self):
+        """Merge models into a sparse community model.
+
+        The resulting model has the same reactions, metabolites and bounds as the
+        model created by `merge_models`, but is assembled from index arrays instead
+        of `reframed` objects. Reaction and metabolite maps are computed on access.
+        """
+        builder = SparseModelBuilder()
+        old_ext_comps = set()
+        ext_mets = []
+        self.reaction_map = MemberIdMap(
+            self.organisms, lambda model: model.reactions, self._member_reaction_id
+        )
+        self.metabolite_map = MemberIdMap(
+            self.organisms, lambda model: model.metabolites, _rename
+        )
+
+        # default IDs
+        ext_comp_id = "ext"
+        biomass_id = "community_biomass"
+        comm_growth = "community_growth"
+
+        # community biomass
+        biomass_row = builder.add_metabolite(biomass_id, ext_comp_id)
+        builder.add_reaction(
+            comm_growth, [biomass_row], [-1], 0, math.inf, ReactionType.OTHER
+        )
+
+        # add each organism
+        for org_id, model in self.organisms.items():
+            for c_id, comp in model.compartments.items():
+                if comp.external:
+                    old_ext_comps.add(c_id)
+
+            # add metabolites
+            local_rows = {}
+            for m_id, met in model.metabolites.items():
+                local_rows[m_id] = builder.add_metabolite(
+                    _rename(org_id, m_id), _rename(org_id, met.compartment)
+                )
+                if (
+                    met.compartment in old_ext_comps
+                    and m_id not in builder.metabolite_index
+                ):
+                    builder.add_metabolite(m_id, ext_comp_id)
+                    ext_mets.append(m_id)
+
+            # add reactions
+            for r_id, rxn in model.reactions.items():
+                new_id = _rename(org_id, r_id)
+                if _is_member_exchange(r_id, rxn):
+                    m_id = next(iter(rxn.stoichiometry))
+                    ext_m_id = biomass_id if r_id == model.biomass_reaction else m_id
+                    builder.add_reaction(
+                        new_id + self.suffix,
+                        [builder.metabolite_index[ext_m_id], local_rows[m_id]],
+                        [1, -1],
+                        -math.inf,
+                        math.inf,
+                        ReactionType.EXCHANGE,
+                    )
+                    continue
+
+                rows = [local_rows[m_id] for m_id in rxn.stoichiometry]
+                coeffs = list(rxn.stoichiometry.values())
+                if r_id == model.biomass_reaction:
+                    rows.append(biomass_row)
+                    coeffs.append(1)
+
+                builder.add_reaction(
+                    new_id,
+                    rows,
+                    coeffs,
+                    0 if not rxn.reversible and rxn.lb < 0 else rxn.lb,
+                    rxn.ub,
+                    rxn.reaction_type,
+                )
+
+        # add exchange reactions
+        for m_id in ext_mets:
+            r_id = f"R_EX_{m_id[2:]}" if m_id.startswith("M_") else f"R_EX_{m_id}"
+            builder.add_reaction(
+                r_id,
+                [builder.metabolite_index[m_id]],
+                [-1],
+                -math.inf,
+                math.inf,
+                ReactionType.EXCHANGE,
             )
 
-        self.solver.update()
+        return builder.build(self.id, comm_growth)
+
+    def _member_reaction_id(self, org_id, r_id):
+        new_id = _rename(org_id, r_id)
+        if _is_member_exchange(r_id, self.organisms[org_id].reactions[r_id]):
+            new_id = new_id + self.suffix
+        return new_id
 
+    def setup_binary_variables(self, minimal_growth):
+        """Setup binary variables for each organism."""
+        self.solver.add_variables_bulk(
+            [f"y_{org_id}" for org_id in self.organisms.keys()],
+            0,
+            1,
+            vartype=VarType.BINARY,
+        )
+
+        constr_ids = []
+        lhs = []
+        senses = []
+        relaxed_bounds = {}
         for org_id, org_model in self.organisms.items():
             org_var = f"y_{org_id}"
             for r_id, reaction in org_model.reactions.items():
@@ -227,79 +350,174 @@ class LayeredCommunity(Community):
                 if reaction.lb * reaction.ub > 0:
                     lbound = -BOUND_INF if math.isinf(reaction.lb) else reaction.lb
                     ubound = BOUND_INF if math.isinf(reaction.ub) else reaction.ub
-                    self.solver.set_bounds({merged_id: (-BOUND_INF, BOUND_INF)})
+                    relaxed_bounds[merged_id] = (-BOUND_INF, BOUND_INF)
 
-                self.solver.add_constraint(
-                    f"c_{merged_id}_lb",
+                constr_ids += [f"c_{merged_id}_lb", f"c_{merged_id}_ub"]
+                lhs += [
                     {merged_id: 1, org_var: -lbound},
-                    ">",
-                    0,
-                )
-                self.solver.add_constraint(
-                    f"c_{merged_id}_ub",
                     {merged_id: 1, org_var: -ubound},
-                    "<",
-                    0,
-                )
+                ]
+                senses += [">", "<"]
 
-        self.solver.update()
+        if relaxed_bounds:
+            self.solver.set_bounds(relaxed_bounds)
+        self.solver.add_constraints_bulk(constr_ids, lhs, senses, 0)
         self.has_binary_variables = True
 
     def setup_growth_requirement(self, minimal_growth):
-        for org_id, org_model in self.organisms.items():
-            merged_id = self.reaction_map[(org_id, org_model.biomass_reaction)]
+        merged_ids = [
+            self.reaction_map[(org_id, org_model.biomass_reaction)]
+            for org_id, org_model in self.organisms.items()
+        ]
+        self.solver.add_constraints_bulk(
+            [f"c_{merged_id}_lb" for merged_id in merged_ids],
+            [{merged_id: 1} for merged_id in merged_ids],
+            ">",
+            minimal_growth,
+        )
+
+    def setup_focal_strain(self, org_id, minimal_growth):
+        """Setup the constraint on the focal strain of the community.
+
+        Communities are required to contain the focal strain. Without a focal strain
+        (`None` or `"min"`) the community itself is required to grow. The previous
+        focal constraint is replaced, such that the community can be reused for
+        different focal strains.
+        """
+        if self.focal_constraint is not None:
+            self.solver.remove_constraint(self.focal_constraint)
+
+        if not org_id or org_id == "min":
+            self.focal_constraint = "c_community_growth"
             self.solver.add_constraint(
-                f"c_{merged_id}_lb",
-                {merged_id: 1},
+                self.focal_constraint,
+                {self.merged_model.biomass_reaction: 1},
                 ">",
                 minimal_growth,
             )
-        self.solver.update()
+        else:
+            self.focal_constraint = f"c_{org_id}_focal"
+            self.solver.add_constraint(
+                self.focal_constraint, {f"y_{org_id}": 1}, ">", 0.5
+            )
 
     def setup_medium(self, medium):
-        """Setup the medium for model on solver."""
+        """Setup the medium for model on solver.
+
+        The medium constraints are added once. Subsequent calls update the right-hand
+        sides of the existing medium constraints in place.
+        """
         missing_reactions = set(medium.keys()) - set(self.merged_model.reactions.keys())
         for r_id in sorted(missing_reactions):
             logging.warning(
                 "Missing reaction %s in model %s", r_id, self.merged_model.id
             )
-        for r_id in self.merged_model.reactions.keys():
-            if r_id.startswith("R_EX_") and not r_id.endswith("_i"):
-                bound = medium[r_id] if r_id in medium.keys() else 0
-                self.solver.add_constraint(
-                    f"c_{r_id}_lb",
-                    {r_id: 1},
-                    ">",
-                    bound,
-                )
+        r_ids = [
+            r_id
+            for r_id in self.merged_model.reactions.keys()
+            if r_id.startswith("R_EX_") and not r_id.endswith("_i")
+        ]
+        bounds = [medium[r_id] if r_id in medium.keys() else 0 for r_id in r_ids]
+
+        if self.has_medium:
+            self.solver.set_rhs(
+                {f"c_{r_id}_lb": bound for r_id, bound in zip(r_ids, bounds)}
+            )
+            return
+
+        self.solver.add_constraints_bulk(
+            [f"c_{r_id}_lb" for r_id in r_ids],
+            [{r_id: 1} for r_id in r_ids],
+            ">",
+            bounds,
+        )
+        self.has_medium = True
 
     def setup_parsimony(self):
-        # add absolute variables for each reaction
-        for rid in self.merged_model.reactions:
-            self.solver.add_variable(f"abs_{rid}_pos", 0, 1000)
-            self.solver.add_variable(f"abs_{rid}_neg", 0, 1000)
+        self.parsimony_objective = {
+            f"abs_{rid}_{sense}": 1
+            for rid in self.merged_model.reactions
+            for sense in ["pos", "neg"]
+        }
 
-        self.solver.update()
+        # add absolute variables for each reaction
+        self.solver.add_variables_bulk(list(self.parsimony_objective), 0, 1000)
 
         # add absolute constraints for each reaction
-        for rid in self.merged_model.reactions:
-            self.solver.add_constraint(
-                f"c_{rid}_abs",
-                {f"abs_{rid}_pos": 1, f"abs_{rid}_neg": -1, rid: -1},
-                "=",
-                0,
-            )
+        self.solver.add_constraints_bulk(
+            [f"c_{rid}_abs" for rid in self.merged_model.reactions],
+            [
+                {f"abs_{rid}_pos": 1, f"abs_{rid}_neg": -1, rid: -1}
+                for rid in self.merged_model.reactions
+            ],
+            "=",
+            0,
+        )
+
+    def copy(self, env=None):
+        """Copy community with a copy of the current problem.
+
+        The copy shares organisms and merged model with this community. The problem
+        is copied into `env` if given, such that the copy can be solved concurrently.
+        """
+        community = copy.copy(self)
+        community.solver = self.solver.copy(env=env)
+        if env is not None:
+            community.env = env
+        return community
+
+    def copy_for_verification(self, parsimony=False):
+        """Copy community to verify candidate communities.
+
+        The copy shares organisms and merged model with this community, but holds a
+        copy of the current problem in which the binary variables are continuous.
+        Candidate communities are verified by fixing the binary variables with
+        `restrict_members`, instead of building a new community model.
+        """
+        community = self.copy()
+        community.solver.set_variable_types(
+            [f"y_{org_id}" for org_id in self.organisms.keys()],
+            VarType.CONTINUOUS,
+        )
+        if parsimony:
+            community.setup_parsimony()
+        return community
+
+    @contextmanager
+    def restrict_members(self, org_ids: list):
+        """Temporarily restrict the community to the given members."""
+        old_bounds = self.solver.set_temporary_bounds(
+            {
+                f"y_{org_id}": (1, 1) if org_id in org_ids else (0, 0)
+                for org_id in self.organisms.keys()
+            }
+        )
+        try:
+            yield self
+        finally:
+            self.solver.reset_bounds(old_bounds)
+
+    def existing_values(self, values: list) -> list:
+        """Values that are reactions of the community.
+
+        The result is computed once for each list of values.
+        """
+        key = tuple(values)
+        if key not in self._existing_values:
+            self._existing_values[key] = [
+                r_id for r_id in values if r_id in self.merged_model.reactions
+            ]
+        return self._existing_values[key]
 
     def check_feasibility(self, values: list):
-        existing_values = set(values) & set(self.merged_model.reactions.keys())
+        existing_values = self.existing_values(values)
         logging.debug("Gathering variables: %s", existing_values)
         return self.solver.solve(get_values=existing_values)
 
     def objective_optimization(self, objective: dict, values: list):
-        existing_values = set(values) & set(self.merged_model.reactions.keys())
         return self.solver.solve(
             objective=objective,
-            get_values=existing_values,
+            get_values=self.existing_values(values),
             minimize=False,
         )
 
@@ -313,17 +531,20 @@ class LayeredCommunity(Community):
             )
             self.solver.update()
 
-        existing_values = set(values) & set(self.merged_model.reactions.keys())
         parsimony_solution = self.solver.solve(
-            objective={
-                f"abs_{rid}_{sense}": 1
-                for rid in self.merged_model.reactions
-                for sense in ["pos", "neg"]
-            },
-            get_values=existing_values,
+            objective=self.parsimony_objective,
+            get_values=self.existing_values(values),
             minimize=True,
         )
 
         self.solver.remove_constraint("c_growth")
 
         return parsimony_solution
+
+
+def _rename(org_id, old_id):
+    return f"{old_id}_{org_id}"
+
+
+def _is_member_exchange(r_id, reaction):
+    return reaction.reaction_type == ReactionType.EXCHANGE and r_id.startswith("R_EX")
@@ -0,0 +1,185 @@
+"""Array based community model."""
+
+from collections.abc import Mapping
+
+import numpy as np
+from reframed import CBReaction, Metabolite
+from scipy.sparse import csc_matrix
+
+
+class SparseCommunityModel:
+    """Community model represented by a sparse stoichiometric matrix.
+
+    The model mimics the parts of `reframed.CBModel` that are used to setup and
+    solve community problems. Reactions and metabolites are only materialized as
+    `reframed` objects when they are accessed individually.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        metabolite_ids: list,
+        compartments: list,
+        reaction_ids: list,
+        reaction_types: list,
+        stoichiometry: csc_matrix,
+        lb: np.ndarray,
+        ub: np.ndarray,
+        biomass_reaction: str,
+    ):
+        self.id = model_id
+        self.metabolite_ids = metabolite_ids
+        self.compartments = compartments
+        self.reaction_ids = reaction_ids
+        self.reaction_types = reaction_types
+        self.stoichiometry = stoichiometry
+        self.lb = lb
+        self.ub = ub
+        self.biomass_reaction = biomass_reaction
+
+        self.metabolite_index = {m_id: i for i, m_id in enumerate(metabolite_ids)}
+        self.reaction_index = {r_id: i for i, r_id in enumerate(reaction_ids)}
+        self.reactions = _ReactionView(self)
+        self.metabolites = _MetaboliteView(self)
+
+    def get_reaction(self, r_id: str) -> CBReaction:
+        """Materialize reaction from stoichiometric matrix."""
+        j = self.reaction_index[r_id]
+        start, stop = self.stoichiometry.indptr[j], self.stoichiometry.indptr[j + 1]
+        stoichiometry = {
+            self.metabolite_ids[i]: coeff
+            for i, coeff in zip(
+                self.stoichiometry.indices[start:stop],
+                self.stoichiometry.data[start:stop].tolist(),
+            )
+        }
+        return CBReaction(
+            r_id,
+            reversible=bool(self.lb[j] < 0),
+            stoichiometry=stoichiometry,
+            lb=float(self.lb[j]),
+            ub=float(self.ub[j]),
+            reaction_type=self.reaction_types[j],
+            objective=1 if r_id == self.biomass_reaction else 0,
+        )
+
+    def get_metabolite(self, m_id: str) -> Metabolite:
+        """Materialize metabolite."""
+        return Metabolite(
+            m_id, compartment=self.compartments[self.metabolite_index[m_id]]
+        )
+
+
+class SparseModelBuilder:
+    """Collect rows, columns and bounds of a sparse community model."""
+
+    def __init__(self):
+        self.metabolite_ids = []
+        self.compartments = []
+        self.metabolite_index = {}
+        self.reaction_ids = []
+        self.reaction_types = []
+        self.lb = []
+        self.ub = []
+        self.rows = []
+        self.cols = []
+        self.coeffs = []
+
+    def add_metabolite(self, m_id: str, compartment: str) -> int:
+        """Add metabolite and return its row."""
+        row = len(self.metabolite_ids)
+        self.metabolite_ids.append(m_id)
+        self.compartments.append(compartment)
+        self.metabolite_index[m_id] = row
+        return row
+
+    def add_reaction(self, r_id: str, rows: list, coeffs: list, lb, ub, reaction_type):
+        """Add reaction with stoichiometric coefficients for the given rows."""
+        col = len(self.reaction_ids)
+        self.reaction_ids.append(r_id)
+        self.reaction_types.append(reaction_type)
+        self.lb.append(lb)
+        self.ub.append(ub)
+        self.rows.extend(rows)
+        self.cols.extend([col] * len(rows))
+        self.coeffs.extend(coeffs)
+
+    def build(self, model_id: str, biomass_reaction: str) -> SparseCommunityModel:
+        """Assemble model."""
+        stoichiometry = csc_matrix(
+            (
+                np.asarray(self.coeffs, dtype=float),
+                (np.asarray(self.rows, dtype=int), np.asarray(self.cols, dtype=int)),
+            ),
+            shape=(len(self.metabolite_ids), len(self.reaction_ids)),
+        )
+        stoichiometry.sum_duplicates()
+        stoichiometry.eliminate_zeros()
+        return SparseCommunityModel(
+            model_id,
+            self.metabolite_ids,
+            self.compartments,
+            self.reaction_ids,
+            self.reaction_types,
+            stoichiometry,
+            np.asarray(self.lb, dtype=float),
+            np.asarray(self.ub, dtype=float),
+            biomass_reaction,
+        )
+
+
+class MemberIdMap(Mapping):
+    """Lazy map from `(org_id, id)` to the id of the element in the community."""
+
+    def __init__(self, organisms, elements, rename):
+        self._organisms = organisms
+        self._elements = elements
+        self._rename = rename
+
+    def __getitem__(self, key):
+        org_id, element_id = key
+        if element_id not in self._elements(self._organisms[org_id]):
+            raise KeyError(key)
+        return self._rename(org_id, element_id)
+
+    def __iter__(self):
+        for org_id, model in self._organisms.items():
+            for element_id in self._elements(model):
+                yield org_id, element_id
+
+    def __len__(self):
+        return sum(len(self._elements(model)) for model in self._organisms.values())
+
+
+class _ReactionView(Mapping):
+    def __init__(self, model: SparseCommunityModel):
+        self._model = model
+
+    def __getitem__(self, r_id):
+        return self._model.get_reaction(r_id)
+
+    def __contains__(self, r_id):
+        return r_id in self._model.reaction_index
+
+    def __iter__(self):
+        return iter(self._model.reaction_ids)
+
+    def __len__(self):
+        return len(self._model.reaction_ids)
+
+
+class _MetaboliteView(Mapping):
+    def __init__(self, model: SparseCommunityModel):
+        self._model = model
+
+    def __getitem__(self, m_id):
+        return self._model.get_metabolite(m_id)
+
+    def __contains__(self, m_id):
+        return m_id in self._model.metabolite_index
+
+    def __iter__(self):
+        return iter(self._model.metabolite_ids)
+
+    def __len__(self):
+        return len(self._model.metabolite_ids)
@@ -1,13 +1,16 @@
 """MiSoS(oup) utilities."""
 import argparse
+import logging
 import sys
 import os
 
 from glob import glob
-from random import sample
 
+import pandas as pd
 import yaml
 
+from .library.readwrite import load_models
+from .library.scaling import run_misosoup, sample_models
 from .library.validate import validate_solution_file
 
 
@@ -74,6 +77,7 @@ def select_ingredients():
         "target", type=str, help="Target directory is created and contains symlinks."
     )
     parser.add_argument("-n", "--n-models", type=int, default=10)
+    parser.add_argument("--seed", type=int, help="Seed of the sample.")
 
     args = parser.parse_args()
 
@@ -100,6 +104,162 @@ def select_ingredients():
 
     os.makedirs(args.target)
 
-    sampled = sample(relative_files, args.n_models)
+    sampled = sample_models(relative_files, args.n_models, args.seed)
     for _sample in sampled:
         os.symlink(_sample, os.path.join(args.target, os.path.basename(_sample)))
+
+
+def synthesize_ingredients():
+    """Create directory with synthetic models derived from real models."""
+    parser = argparse.ArgumentParser(
+        description="Create synthetic community members by knocking out reactions."
+    )
+    parser.add_argument("--log", default="INFO")
+    parser.add_argument("source", type=str, help="Source directory with sbml models.")
+    parser.add_argument(
+        "target", type=str, help="Target directory is created and contains models."
+    )
+    parser.add_argument("-n", "--n-models", type=int, default=10)
+    parser.add_argument(
+        "--knockouts",
+        type=int,
+        default=10,
+        help="Number of reaction knockouts per model. Default: 10.",
+    )
+    parser.add_argument(
+        "--minimal-growth",
+        type=float,
+        default=0.1,
+        help="Growth rate every model has to reach. Default: 0.1.",
+    )
+    parser.add_argument(
+        "--uptake",
+        type=float,
+        default=10,
+        help="Maximal uptake rate of every compound in the growth checks. Default: 10.",
+    )
+    parser.add_argument("--seed", type=int, help="Seed of the random knockouts.")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log.upper())
+
+    # import here, such that the other utilities do not require a gurobi license
+    from reframed.io.sbml import save_cbmodel
+
+    from .library.synthetic import synthesize_members
+    from .reframed.layered_community import LayeredCommunity
+
+    files = sorted(glob(os.path.join(args.source, "*.xml")))
+    models = load_models(files)
+    members = synthesize_members(
+        models,
+        args.n_models,
+        knockouts=args.knockouts,
+        minimal_growth=args.minimal_growth,
+        uptake=args.uptake,
+        seed=args.seed,
+        env=LayeredCommunity.default_environment,
+    )
+
+    os.makedirs(args.target)
+    for member in members:
+        save_cbmodel(member, os.path.join(args.target, f"{member.id}.xml"))
+
+
+def scale_soup():
+    """Run `misosoup` on sampled communities of increasing size."""
+    parser = argparse.ArgumentParser(
+        description=(
+            "Run `misosoup` on sampled communities of increasing size and record the "
+            "cost of every run. Arguments after `--` are passed to `misosoup`."
+        )
+    )
+    parser.add_argument("--log", default="INFO")
+    parser.add_argument("source", type=str, help="Source directory with sbml models.")
+    parser.add_argument("--media", type=str, required=True, help="Media file.")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        required=True,
+        help="Numbers of models of the sampled communities.",
+    )
+    parser.add_argument(
+        "--seeds",
+        type=int,
+        default=3,
+        help="Number of sampled communities per size. Default: 3.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default="scaling.csv",
+        help=(
+            "Table of the runs, written as parquet if the path ends with `.parquet`. "
+            "Default: scaling.csv."
+        ),
+    )
+    parser.add_argument(
+        "--work-dir",
+        type=str,
+        default="scaling",
+        help="Directory of the outputs, metrics and logs of the runs. Default: scaling.",
+    )
+
+    argv = sys.argv[1:]
+    arguments = []
+    if "--" in argv:
+        index = argv.index("--")
+        argv, arguments = argv[:index], argv[index + 1 :]
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log.upper(), format="%(asctime)s %(message)s")
+
+    files = glob(os.path.join(args.source, "*.xml"))
+    invalid_sizes = [size for size in args.sizes if not 0 < size <= len(files)]
+    if invalid_sizes:
+        parser.error(
+            f"sizes {invalid_sizes} are not between 1 and the {len(files)} models "
+            f"in {args.source}"
+        )
+
+    rows = []
+    for size in args.sizes:
+        for seed in range(args.seeds):
+            logging.info("Run community of size %i with seed %i.", size, seed)
+            statistics = run_misosoup(
+                sample_models(files, size, seed),
+                args.media,
+                os.path.join(args.work_dir, f"size_{size}", f"seed_{seed}"),
+                arguments,
+            )
+            if statistics["returncode"]:
+                logging.warning(
+                    "Run of size %i with seed %i failed with exit code %i.",
+                    size,
+                    seed,
+                    statistics["returncode"],
+                )
+            rows.append({"size": size, "seed": seed, **statistics})
+            # write the table after every run, such that aborted studies are kept
+            _write_table(pd.DataFrame(rows), args.output)
+
+        runs = pd.DataFrame(rows).query("size == @size")
+        logging.info(
+            "Size %i: median wall time %.2f s, peak memory %.1f MB.",
+            size,
+            runs["wall_time"].median(),
+            runs["peak_rss"].max() / 2**20,
+        )
+
+
+def _write_table(table, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.endswith(".parquet"):
+        table.to_parquet(path, index=False)
+    else:
+        table.to_csv(path, index=False)
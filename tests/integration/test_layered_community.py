@@ -0,0 +1,102 @@
+"""Integration tests for the layered community."""
+from misosoup.library.readwrite import load_models
+from misosoup.reframed.layered_community import LayeredCommunity
+
+MODEL_PATHS = ["tests/data/A1R12.xml", "tests/data/I2R16.xml"]
+
+
+def _problem_structure(community):
+    problem = community.solver.problem
+    problem.update()
+    variables = problem.getVars()
+    names = problem.getAttr("VarName", variables)
+    bounds = dict(
+        zip(
+            names,
+            zip(problem.getAttr("LB", variables), problem.getAttr("UB", variables)),
+        )
+    )
+    matrix = problem.getA().tocsr()
+    rows = {}
+    for i, constraint in enumerate(problem.getAttr("ConstrName", problem.getConstrs())):
+        start, stop = matrix.indptr[i], matrix.indptr[i + 1]
+        rows[constraint] = dict(
+            zip([names[j] for j in matrix.indices[start:stop]], matrix.data[start:stop])
+        )
+    return bounds, rows
+
+
+def test_sparse_merge():
+    """Check if the sparse community model yields the same problem."""
+    models = load_models(MODEL_PATHS, use_cache=False)
+    community = LayeredCommunity("community", models)
+    sparse_community = LayeredCommunity("community", models, sparse=True)
+
+    assert _problem_structure(community) == _problem_structure(sparse_community)
+    assert dict(community.reaction_map) == dict(sparse_community.reaction_map)
+    assert dict(community.metabolite_map) == dict(sparse_community.metabolite_map)
+    assert list(community.merged_model.reactions) == list(
+        sparse_community.merged_model.reactions
+    )
+
+
+def test_binary_variable_constraints():
+    """Check if biomass and exchange reactions are bound by binary variables."""
+    community = LayeredCommunity("community", load_models(MODEL_PATHS, use_cache=False))
+    community.setup_binary_variables(0.01)
+    problem = community.solver.problem
+
+    growth = problem.getConstrByName("c_Growth_A1R12_lb")
+    row = problem.getRow(growth)
+    coeffs = {row.getVar(i).VarName: row.getCoeff(i) for i in range(row.size())}
+    assert coeffs == {"Growth_A1R12": 1, "y_A1R12": -0.01}
+    assert growth.Sense == ">"
+
+    exchange = problem.getConstrByName("c_R_EX_ac_e_I2R16_i_ub")
+    row = problem.getRow(exchange)
+    coeffs = {row.getVar(i).VarName: row.getCoeff(i) for i in range(row.size())}
+    assert coeffs == {"R_EX_ac_e_I2R16_i": 1, "y_I2R16": -1000}
+    assert exchange.Sense == "<"
+
+
+def test_medium_update():
+    """Check if changing the medium updates constraints in place."""
+    community = LayeredCommunity("community", load_models(MODEL_PATHS, use_cache=False))
+    community.setup_medium({"R_EX_ac_e": -10})
+    community.solver.update()
+    num_constraints = community.solver.problem.NumConstrs
+
+    community.setup_medium({"R_EX_glc__D_e": -10})
+    community.solver.update()
+    problem = community.solver.problem
+    assert problem.NumConstrs == num_constraints
+    assert problem.getConstrByName("c_R_EX_ac_e_lb").RHS == 0
+    assert problem.getConstrByName("c_R_EX_glc__D_e_lb").RHS == -10
+
+
+def test_focal_strain_update():
+    """Check if changing the focal strain replaces the focal constraint."""
+    community = LayeredCommunity("community", load_models(MODEL_PATHS, use_cache=False))
+    community.setup_binary_variables(0.01)
+    community.setup_focal_strain("A1R12", 0.01)
+    community.solver.update()
+    num_constraints = community.solver.problem.NumConstrs
+
+    community.setup_focal_strain("I2R16", 0.01)
+    community.solver.update()
+    problem = community.solver.problem
+    assert problem.NumConstrs == num_constraints
+    assert problem.getConstrByName("c_A1R12_focal") is None
+    assert problem.getConstrByName("c_I2R16_focal").RHS == 0.5
+
+
+def test_solution_pool_reset():
+    """Check if the default solution pool is restored after a pooled search."""
+    community = LayeredCommunity("community", load_models(MODEL_PATHS, use_cache=False))
+    params = community.solver.problem.Params
+    defaults = (params.PoolSearchMode, params.PoolSolutions, params.PoolGap)
+
+    community.solver.set_solution_pool(5)
+    assert (params.PoolSearchMode, params.PoolSolutions, params.PoolGap) == (2, 5, 0)
+    community.solver.set_solution_pool(None)
+    assert (params.PoolSearchMode, params.PoolSolutions, params.PoolGap) == defaults
@@ -1,5 +1,6 @@
 """Integration tests for misosoup."""
 
+import json
 import subprocess
 
 import yaml
@@ -17,6 +18,38 @@ def test_installation():
     assert complete_process.returncode == 0
 
 
+def _run_misosoup(*arguments):
+    complete_process = subprocess.run(
+        [
+            "misosoup",
+            "--media",
+            "tests/data/medium.yaml",
+            *arguments,
+            "--parsimony",
+            "tests/data/A1R12.xml",
+            "tests/data/I2R16.xml",
+        ],
+        capture_output=True,
+        check=False,
+    )
+    assert complete_process.returncode == 0
+    return yaml.safe_load(complete_process.stdout.decode("utf8"))
+
+
+def _communities(out):
+    return {
+        medium_id: {
+            strain: sorted(
+                sorted(solution["community"])
+                for solution in solutions
+                if "community" in solution
+            )
+            for strain, solutions in strains.items()
+        }
+        for medium_id, strains in out.items()
+    }
+
+
 def test_integration():
     """Run example problem."""
     complete_process = subprocess.run(
@@ -39,3 +72,193 @@ def test_integration():
     print(out)
     assert out["ac"]["A1R12"][0]["community"]["y_A1R12"] == 1
     assert out["ac"]["A1R12"][0]["community"]["y_I2R16"] == 1
+
+
+def test_integration_restricted_verification():
+    """Run example problem and verify candidates on the base community problem."""
+    complete_process = subprocess.run(
+        [
+            "misosoup",
+            "--media",
+            "tests/data/medium.yaml",
+            "--strain",
+            "A1R12",
+            "--parsimony",
+            "--verification",
+            "restrict",
+            "tests/data/A1R12.xml",
+            "tests/data/I2R16.xml",
+        ],
+        capture_output=True,
+        check=False,
+    )
+    assert complete_process.returncode == 0
+    out = yaml.safe_load(complete_process.stdout.decode("utf8"))
+    assert out["ac"]["A1R12"][0]["community"] == {"y_A1R12": 1, "y_I2R16": 1}
+
+
+def test_integration_parallel_media():
+    """Run example problem with media computed in separate processes."""
+    complete_process = subprocess.run(
+        [
+            "misosoup",
+            "--media",
+            "tests/data/medium.yaml",
+            "--strain",
+            "A1R12",
+            "--parsimony",
+            "--jobs",
+            "2",
+            "tests/data/A1R12.xml",
+            "tests/data/I2R16.xml",
+        ],
+        capture_output=True,
+        check=False,
+    )
+    assert complete_process.returncode == 0
+    out = yaml.safe_load(complete_process.stdout.decode("utf8"))
+    assert out["ac"]["A1R12"][0]["community"]["y_A1R12"] == 1
+    assert out["ac"]["A1R12"][0]["community"]["y_I2R16"] == 1
+
+
+def test_integration_parallel_cache_files(tmp_path):
+    """Check if every medium of a parallel run records its own cache file."""
+    with open("tests/data/medium.yaml", encoding="utf8") as stream:
+        media = yaml.safe_load(stream)
+    media["ac2"] = dict(media["ac"])
+    media_file = tmp_path / "media.yaml"
+    media_file.write_text(yaml.dump(media))
+
+    serial = _run_misosoup("--media", str(media_file), "--strain", "A1R12")
+    parallel = _run_misosoup(
+        "--media",
+        str(media_file),
+        "--strain",
+        "A1R12",
+        "--jobs",
+        "2",
+        "--cache-file",
+        str(tmp_path / "cache.yaml"),
+    )
+    assert _communities(parallel) == _communities(serial)
+    assert (tmp_path / "cache_ac.yaml").exists()
+    assert (tmp_path / "cache_ac2.yaml").exists()
+    assert not (tmp_path / "cache.yaml").exists()
+
+
+def test_integration_lazy_enumeration():
+    """Run example problem and enumerate communities with lazy constraints."""
+    complete_process = subprocess.run(
+        [
+            "misosoup",
+            "--media",
+            "tests/data/medium.yaml",
+            "--strain",
+            "A1R12",
+            "--parsimony",
+            "--enumeration",
+            "lazy",
+            "tests/data/A1R12.xml",
+            "tests/data/I2R16.xml",
+        ],
+        capture_output=True,
+        check=False,
+    )
+    assert complete_process.returncode == 0
+    out = yaml.safe_load(complete_process.stdout.decode("utf8"))
+    assert out["ac"]["A1R12"][0]["community"] == {"y_A1R12": 1, "y_I2R16": 1}
+
+
+def test_integration_layered_enumeration():
+    """Run example problem and enumerate communities in order of size."""
+    complete_process = subprocess.run(
+        [
+            "misosoup",
+            "--media",
+            "tests/data/medium.yaml",
+            "--strain",
+            "A1R12",
+            "--parsimony",
+            "--enumeration",
+            "layered",
+            "--community-size",
+            "2",
+            "tests/data/A1R12.xml",
+            "tests/data/I2R16.xml",
+        ],
+        capture_output=True,
+        check=False,
+    )
+    assert complete_process.returncode == 0
+    out = yaml.safe_load(complete_process.stdout.decode("utf8"))
+    assert out["ac"]["A1R12"][0]["community"] == {"y_A1R12": 1, "y_I2R16": 1}
+
+
+def test_integration_time_limit(tmp_path):
+    """Run example problem and stop at the time limit of the community problem."""
+    status_file = tmp_path / "status.yaml"
+    complete_process = subprocess.run(
+        [
+            "misosoup",
+            "--media",
+            "tests/data/medium.yaml",
+            "--strain",
+            "A1R12",
+            "--milp-time-limit",
+            "1e-6",
+            "--status",
+            str(status_file),
+            "tests/data/A1R12.xml",
+            "tests/data/I2R16.xml",
+        ],
+        capture_output=True,
+        check=False,
+    )
+    assert complete_process.returncode == 0
+    out = yaml.safe_load(complete_process.stdout.decode("utf8"))
+    assert list(out) == ["ac"]
+    status = yaml.safe_load(status_file.read_text())
+    assert status == {
+        "complete": False,
+        "incomplete": {"ac": ["A1R12"]},
+        "failed": [],
+    }
+
+
+def test_integration_verification_workers():
+    """Check if concurrent verification yields the solutions of the serial run."""
+    for strain in ["all", "min"]:
+        serial = _run_misosoup("--strain", strain)
+        pipelined = _run_misosoup("--verification-workers", "2", "--strain", strain)
+        assert pipelined == serial
+
+
+def test_integration_solution_pool():
+    """Check if the solution pool yields the communities of the iterative run."""
+    for strain in ["all", "min"]:
+        iterative = _run_misosoup("--strain", strain)
+        pooled = _run_misosoup("--solution-pool", "5", "--strain", strain)
+        assert _communities(pooled) == _communities(iterative)
+
+
+def test_integration_verification_cache_modes(tmp_path):
+    """Check if cached verifications are only reused in the same verification mode."""
+    events_file = tmp_path / "events.jsonl"
+
+    def cached_verifications(verification):
+        _run_misosoup(
+            "--verification",
+            verification,
+            "--verification-cache",
+            str(tmp_path / "cache"),
+            "--events",
+            str(events_file),
+            "--strain",
+            "A1R12",
+        )
+        events = [json.loads(line) for line in events_file.read_text().splitlines()]
+        return [event["cached"] for event in events if event["event"] == "verification"]
+
+    assert not any(cached_verifications("rebuild"))
+    assert not any(cached_verifications("restrict"))
+    assert all(cached_verifications("restrict"))
@@ -0,0 +1,34 @@
+"""Integration tests for synthetic community members."""
+from misosoup.library.readwrite import load_models
+from misosoup.library.synthetic import synthesize_members
+from misosoup.reframed.layered_community import LayeredCommunity
+
+MODEL_PATHS = ["tests/data/A1R12.xml", "tests/data/I2R16.xml"]
+
+
+def _blocked(model):
+    return [
+        r_id
+        for r_id, reaction in model.reactions.items()
+        if reaction.lb == 0 == reaction.ub
+    ]
+
+
+def test_synthetic_members():
+    """Check if synthetic members are distinct, feasible and reproducible."""
+    models = load_models(MODEL_PATHS, use_cache=False)
+    env = LayeredCommunity.default_environment
+    members = synthesize_members(models, 4, knockouts=5, seed=0, env=env)
+    repeated = synthesize_members(models, 4, knockouts=5, seed=0, env=env)
+
+    assert [member.id for member in members] == [
+        "A1R12_0",
+        "I2R16_1",
+        "A1R12_2",
+        "I2R16_3",
+    ]
+    assert [_blocked(member) for member in members] == [
+        _blocked(member) for member in repeated
+    ]
+    for member, model in zip(members, models * 2):
+        assert len(_blocked(member)) == len(_blocked(model)) + 5
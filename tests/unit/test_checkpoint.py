@@ -0,0 +1,43 @@
+"""Test checkpoint store."""
+from misosoup.library.checkpoint import CheckpointStore
+
+MEDIUM = {"R_EX_ac_e": -10}
+
+
+def test_mark_done(tmp_path):
+    """Check if solutions of finished searches are stored per medium and strain."""
+    store = CheckpointStore(str(tmp_path), "models")
+    solutions = [{"community": {"y_A": 1}, "solution": {"Growth_A": 0.1}}]
+    assert store.load_done("ac", MEDIUM, "A") is None
+
+    store.mark_done("ac", MEDIUM, "A", solutions)
+    assert store.load_done("ac", MEDIUM, "A") == solutions
+    assert store.load_done("ac", MEDIUM, "min") is None
+    assert CheckpointStore(str(tmp_path), "other").load_done("ac", MEDIUM, "A") is None
+
+
+def test_changed_medium_and_settings(tmp_path):
+    """Check if checkpoints are not reused for other media or search settings."""
+    settings = {"parsimony": False, "minimal_growth": 0.1}
+    store = CheckpointStore(str(tmp_path), "models", settings)
+    store.mark_done("ac", MEDIUM, "A", [])
+    assert store.load_done("ac", MEDIUM, "A") == []
+
+    assert store.load_done("ac", {**MEDIUM, "R_EX_o2_e": -10}, "A") is None
+    changed = CheckpointStore(str(tmp_path), "models", {**settings, "parsimony": True})
+    assert changed.load_done("ac", MEDIUM, "A") is None
+    assert changed.journal_path("ac", MEDIUM, "A") != store.journal_path(
+        "ac", MEDIUM, "A"
+    )
+
+
+def test_separate_journals(tmp_path):
+    """Check if every medium and strain has its own journal."""
+    store = CheckpointStore(str(tmp_path), "models")
+    paths = {
+        store.journal_path(medium_id, MEDIUM, strain)
+        for medium_id in ["ac", "glc", "a/b"]
+        for strain in ["A", "min"]
+    }
+    assert len(paths) == 6
+    assert all(path.startswith(str(tmp_path / "models")) for path in paths)
@@ -0,0 +1,21 @@
+"""Test event log."""
+import json
+
+from misosoup.library.events import EventLog
+
+
+def test_log_events(tmp_path):
+    """Check if events are logged as JSON lines with their context."""
+    path = tmp_path / "events.jsonl"
+    events = EventLog(str(path), medium="ac")
+    events.reset()
+
+    events.bind(strain="A")({"event": "candidate", "members": ["A", "B"]})
+    events({"event": "medium_done", "incomplete": []})
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["event"] for record in records] == ["candidate", "medium_done"]
+    assert records[0]["strain"] == "A" and records[0]["members"] == ["A", "B"]
+    assert all(record["medium"] == "ac" for record in records)
+    assert "strain" not in records[1]
+    assert all("timestamp" in record for record in records)
@@ -0,0 +1,35 @@
+"""Test atomic file writes and compressed pickle files."""
+import pytest
+
+from misosoup.library.fileio import (
+    atomic_write,
+    load_compressed_pickle,
+    store_compressed_pickle,
+)
+
+
+def test_atomic_write(tmp_path):
+    """Check if the file is only replaced once it is completely written."""
+    path = tmp_path / "sub" / "file.txt"
+    with atomic_write(str(path)) as file_descriptor:
+        file_descriptor.write("first")
+    assert path.read_text() == "first"
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as file_descriptor:
+            file_descriptor.write("second")
+            raise RuntimeError()
+    assert path.read_text() == "first"
+    assert [entry.name for entry in path.parent.iterdir()] == ["file.txt"]
+
+
+def test_compressed_pickle(tmp_path):
+    """Check if missing and corrupted files yield the default."""
+    path = tmp_path / "entry.pickle.z"
+    assert load_compressed_pickle(str(path), "missing") == "missing"
+
+    store_compressed_pickle(str(path), {"a": [1, 2]})
+    assert load_compressed_pickle(str(path)) == {"a": [1, 2]}
+
+    path.write_bytes(b"corrupted")
+    assert load_compressed_pickle(str(path), "missing") == "missing"
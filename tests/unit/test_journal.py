@@ -0,0 +1,44 @@
+"""Test cache journal."""
+from misosoup.library.journal import CacheJournal
+
+
+def test_append_and_read(tmp_path):
+    """Check if appended records are read in order."""
+    path = str(tmp_path / "cache.yaml")
+    journal = CacheJournal(path, sync_records=2)
+    for i in range(3):
+        journal.append({"type": "community", "name": f"c_{i}", "mask": 1 << i})
+    journal.close()
+    assert [record["mask"] for record in CacheJournal.read(path)] == [1, 2, 4]
+    assert CacheJournal.is_journal(path)
+
+
+def test_skip_incomplete_record(tmp_path):
+    """Check if a partially written last record is skipped."""
+    path = tmp_path / "cache.yaml"
+    path.write_text('{"type": "community", "name": "c_0", "mask": 1}\n{"type": "co')
+    assert CacheJournal.read(str(path)) == [
+        {"type": "community", "name": "c_0", "mask": 1}
+    ]
+
+
+def test_compact(tmp_path):
+    """Check if compaction replaces the journal and appending continues."""
+    path = str(tmp_path / "cache.yaml")
+    journal = CacheJournal(path)
+    journal.append({"type": "solution", "mask": 3, "solution": {}})
+    journal.compact([{"type": "header", "members": ["y_A", "y_B"]}])
+    journal.append({"type": "solution", "mask": 1, "solution": {}})
+    journal.close()
+    assert journal.records == 2
+    assert [record["type"] for record in CacheJournal.read(path)] == [
+        "header",
+        "solution",
+    ]
+
+
+def test_detect_yaml_cache(tmp_path):
+    """Check if YAML caches of previous versions are detected."""
+    path = tmp_path / "cache.yaml"
+    path.write_text("community_constraints: {}\n")
+    assert not CacheJournal.is_journal(str(path))
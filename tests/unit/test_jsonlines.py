@@ -0,0 +1,43 @@
+"""Test JSON lines sink."""
+import json
+import math
+
+from misosoup.library.events import EventLog
+from misosoup.library.jsonlines import JsonLinesSink
+from misosoup.library.metrics import MetricsRecorder
+
+
+def test_write_records(tmp_path):
+    """Check if records are appended with their context."""
+    path = tmp_path / "records.jsonl"
+    sink = JsonLinesSink(str(path), medium="ac")
+    sink.reset()
+
+    sink.write({"value": 1})
+    sink.bind(strain="A").write({"value": math.inf, "medium": "glc"})
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert records == [
+        {"medium": "ac", "value": 1},
+        {"medium": "glc", "strain": "A", "value": None},
+    ]
+
+
+def test_bind_keeps_type():
+    """Check if bound sinks keep their type."""
+    assert isinstance(EventLog("events.jsonl").bind(strain="A"), EventLog)
+    assert isinstance(
+        MetricsRecorder("metrics.jsonl").bind(strain="A"), MetricsRecorder
+    )
+
+
+def test_disabled(tmp_path):
+    """Check if nothing is written without path."""
+    for sink in [JsonLinesSink(), EventLog(), MetricsRecorder()]:
+        sink.write({"value": 1})
+        sink.reset()
+        assert not sink.enabled
+    with MetricsRecorder().phase("load_models") as fields:
+        fields["models"] = 2
+    EventLog()({"event": "candidate"})
+    assert not list(tmp_path.iterdir())
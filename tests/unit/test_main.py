@@ -0,0 +1,26 @@
+"""Test collection of media computed in parallel."""
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+from misosoup.main import _collect_media_solutions
+
+
+def _future(result=None, exception=None):
+    future = Future()
+    if exception is None:
+        future.set_result(result)
+    else:
+        future.set_exception(exception)
+    return future
+
+
+def test_collect_media_solutions():
+    """Check if crashed and failed media are reported instead of dropped."""
+    futures = {
+        _future(result="solutions"): "ac",
+        _future(exception=BrokenProcessPool()): "glc",
+        _future(exception=ValueError()): "suc",
+    }
+    results = {}
+    assert _collect_media_solutions(futures, results) == (["glc"], ["suc"])
+    assert results == {"ac": "solutions"}
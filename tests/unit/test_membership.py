@@ -0,0 +1,28 @@
+"""Test membership encoding."""
+from misosoup.library.membership import MembershipEncoder
+
+
+def test_encode_decode():
+    """Check if members are decoded in the order of the encoder."""
+    encoder = MembershipEncoder(["y_A", "y_B", "y_C"])
+    mask = encoder.encode(["y_C", "y_A"])
+    assert mask == 0b101
+    assert encoder.decode(mask) == ["y_A", "y_C"]
+    assert encoder.size(mask) == 2
+
+
+def test_complement():
+    """Check if the complement contains all other members."""
+    encoder = MembershipEncoder(["y_A", "y_B", "y_C"])
+    assert encoder.decode(encoder.complement(encoder.encode(["y_B"]))) == [
+        "y_A",
+        "y_C",
+    ]
+    assert encoder.complement(encoder.full) == 0
+
+
+def test_reencode_with_other_ordering():
+    """Check if masks can be translated between member orderings."""
+    encoder = MembershipEncoder(["y_A", "y_B", "y_C"])
+    other = MembershipEncoder(["y_C", "y_B", "y_A"])
+    assert other.encode(encoder.decode(0b011)) == 0b110
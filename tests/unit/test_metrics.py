@@ -0,0 +1,27 @@
+"""Test metrics recorder."""
+import json
+
+from misosoup.library.metrics import MetricsRecorder
+
+
+def test_record_phases(tmp_path):
+    """Check if phases are recorded as JSON lines with their context."""
+    path = tmp_path / "metrics.jsonl"
+    metrics = MetricsRecorder(str(path), medium="ac")
+    metrics.reset()
+
+    with metrics.phase("load_models", models=2):
+        pass
+    with metrics.bind(strain="A").phase("minimize") as fields:
+        fields["solutions"] = 1
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["phase"] for record in records] == ["load_models", "minimize"]
+    assert records[0]["models"] == 2
+    assert records[1]["solutions"] == 1
+    assert records[1]["medium"] == "ac" and records[1]["strain"] == "A"
+    assert all(record["wall_time"] >= 0 for record in records)
+    assert all("peak_rss" in record for record in records)
+
+    metrics.reset()
+    assert path.read_text() == ""
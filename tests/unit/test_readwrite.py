@@ -0,0 +1,47 @@
+"""Test readwrite."""
+import os
+
+import pytest
+
+from misosoup.library.readwrite import load_models
+
+MODEL_PATHS = ["tests/data/A1R12.xml", "tests/data/I2R16.xml"]
+
+
+def test_load_models_in_order(tmp_path):
+    """Check if models loaded by workers keep the input order."""
+    models = load_models(MODEL_PATHS[::-1], workers=2, cache_dir=str(tmp_path))
+    assert [model.id for model in models] == ["I2R16", "A1R12"]
+
+
+def test_report_failed_model(tmp_path):
+    """Check if the path of a model that fails to load is reported."""
+    with pytest.raises(RuntimeError, match="missing.xml"):
+        load_models(
+            MODEL_PATHS + ["tests/data/missing.xml"],
+            workers=2,
+            cache_dir=str(tmp_path),
+        )
+
+
+def test_load_cached_models(tmp_path):
+    """Check if cached models are identical to parsed models."""
+    parsed = load_models(MODEL_PATHS, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == len(MODEL_PATHS)
+
+    cached = load_models(MODEL_PATHS, cache_dir=str(tmp_path))
+    for parsed_model, cached_model in zip(parsed, cached):
+        assert cached_model.id == parsed_model.id
+        assert cached_model.biomass_reaction == parsed_model.biomass_reaction
+        assert list(cached_model.reactions) == list(parsed_model.reactions)
+
+
+def test_ignore_corrupted_cache(tmp_path):
+    """Check if corrupted cache entries are parsed again."""
+    load_models(MODEL_PATHS[:1], cache_dir=str(tmp_path))
+    for entry in os.listdir(tmp_path):
+        with open(tmp_path / entry, "wb") as file_descriptor:
+            file_descriptor.write(b"corrupted")
+
+    models = load_models(MODEL_PATHS[:1], cache_dir=str(tmp_path))
+    assert models[0].id == "A1R12"
@@ -0,0 +1,68 @@
+"""Test scaling study."""
+import json
+
+import yaml
+
+from misosoup.library.scaling import read_run_statistics, sample_models
+
+
+def _write_json_lines(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+
+def test_sample_models():
+    """Check if samples are reproducible and independent of the path order."""
+    paths = [f"{name}.xml" for name in "ABCDEFGH"]
+    sampled = sample_models(paths, 3, seed=1)
+    assert len(set(sampled)) == 3
+    assert sampled == sample_models(list(reversed(paths)), 3, seed=1)
+
+
+def test_read_run_statistics(tmp_path):
+    """Check if statistics are read from the output, status, metrics and events."""
+    (tmp_path / "output.yaml").write_text(
+        yaml.dump(
+            {
+                "glc": {
+                    "A": [{"community": {"y_A": 1}}, {"community": {"y_B": 1}}],
+                    "B": [{"Growth_B": 0}],
+                    "C": [],
+                },
+            }
+        )
+    )
+    (tmp_path / "status.yaml").write_text(
+        yaml.dump({"complete": False, "incomplete": {"glc": ["C"]}})
+    )
+    _write_json_lines(
+        tmp_path / "metrics.jsonl",
+        [{"phase": "milp"}, {"phase": "build_candidate"}, {"phase": "milp"}],
+    )
+    _write_json_lines(
+        tmp_path / "events.jsonl",
+        [
+            {"event": "cut", "community_constraints": 1, "knowledge_constraints": 0},
+            {
+                "event": "search_done",
+                "community_constraints": 2,
+                "knowledge_constraints": 1,
+            },
+            {
+                "event": "search_done",
+                "community_constraints": 1,
+                "knowledge_constraints": 0,
+            },
+        ],
+    )
+
+    assert read_run_statistics(str(tmp_path)) == {
+        "milps": 2,
+        "cuts": 4,
+        "solutions": 2,
+        "incomplete": 1,
+    }
+
+
+def test_read_missing_statistics(tmp_path):
+    """Check if statistics of missing files are `None`."""
+    assert set(read_run_statistics(str(tmp_path)).values()) == {None}
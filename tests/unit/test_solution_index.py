@@ -0,0 +1,34 @@
+"""Test solution index."""
+from misosoup.library.solution_index import SolutionIndex
+
+
+def _index(masks):
+    index = SolutionIndex()
+    for mask in masks:
+        index.add(mask, {"mask": mask})
+    return index
+
+
+def test_supersets():
+    """Check if all solutions containing a community are found."""
+    index = _index([0b011, 0b110, 0b111, 0b100])
+    assert index.supersets(0b010) == [0, 1, 2]
+    assert index.supersets(0b101) == [2]
+    assert index.supersets(0b000) == [0, 1, 2, 3]
+
+
+def test_subsets():
+    """Check if all solutions contained in a community are found."""
+    index = _index([0b011, 0b110, 0b111, 0b100])
+    assert index.subsets(0b110) == [1, 3]
+    assert index.subsets(0b001) == []
+
+
+def test_replace_all_supersets():
+    """Check if all supersets are replaced by a single solution."""
+    index = _index([0b011, 0b100, 0b111])
+    index.replace(index.supersets(0b001), 0b001, {"mask": 0b001})
+    assert index.solutions() == [{"mask": 0b001}, {"mask": 0b100}]
+    assert len(index) == 2
+    assert index.supersets(0b010) == []
+    assert index.supersets(0b001) == [0]
@@ -0,0 +1,43 @@
+"""Test sparse model."""
+import math
+
+from reframed import ReactionType
+
+from misosoup.reframed.sparse_model import SparseModelBuilder
+
+
+def build_model():
+    """Build model with one transport and one exchange reaction."""
+    builder = SparseModelBuilder()
+    ext = builder.add_metabolite("M_a_e", "ext")
+    cyt = builder.add_metabolite("M_a_c_AAAA", "C_c_AAAA")
+    builder.add_reaction("R_t_AAAA", [ext, cyt], [-1, 1], 0, 10, ReactionType.TRANSPORT)
+    builder.add_reaction(
+        "R_EX_a_e", [ext], [-1], -math.inf, math.inf, ReactionType.EXCHANGE
+    )
+    return builder.build("community", "R_t_AAAA")
+
+
+def test_stoichiometry():
+    """Check if reactions are materialized with their stoichiometry and bounds."""
+    model = build_model()
+    assert model.stoichiometry.shape == (2, 2)
+
+    reaction = model.reactions["R_t_AAAA"]
+    assert dict(reaction.stoichiometry) == {"M_a_e": -1, "M_a_c_AAAA": 1}
+    assert (reaction.lb, reaction.ub) == (0, 10)
+    assert not reaction.reversible
+
+    exchange = model.reactions["R_EX_a_e"]
+    assert exchange.reaction_type == ReactionType.EXCHANGE
+    assert exchange.reversible
+
+
+def test_model_views():
+    """Check if reaction and metabolite views behave like dictionaries."""
+    model = build_model()
+    assert list(model.reactions.keys()) == ["R_t_AAAA", "R_EX_a_e"]
+    assert "R_EX_a_e" in model.reactions
+    assert "R_EX_b_e" not in model.reactions
+    assert model.metabolites["M_a_c_AAAA"].compartment == "C_c_AAAA"
+    assert len(model.metabolites) == 2
@@ -0,0 +1,25 @@
+"""Test telemetry summaries."""
+from misosoup.library.telemetry import merge_summaries, summarize_telemetry
+
+
+def test_summarize_telemetry():
+    """Check if statistics are summed and the largest finite gap is kept."""
+    statistics = [
+        {"runtime": 1.5, "node_count": 10.0, "iter_count": 100.0, "mip_gap": 0.1},
+        {"runtime": 0.5, "node_count": 0.0, "iter_count": 20.0, "mip_gap": None},
+        {"runtime": 0.1, "node_count": 1.0, "iter_count": 0.0, "mip_gap": float("inf")},
+    ]
+    summary = summarize_telemetry(statistics)
+    assert summary["solves"] == 3
+    assert summary["runtime"] == 2.1
+    assert summary["node_count"] == 11
+    assert summary["iter_count"] == 120
+    assert summary["max_mip_gap"] == 0.1
+
+    empty = summarize_telemetry([])
+    assert empty["solves"] == 0 and empty["max_mip_gap"] is None
+
+    merged = merge_summaries([summary, empty, summary])
+    assert merged["solves"] == 6
+    assert merged["node_count"] == 22
+    assert merged["max_mip_gap"] == 0.1
@@ -0,0 +1,44 @@
+"""Test verification cache."""
+import os
+
+from misosoup.library.verification_cache import VerificationCache
+
+
+def test_key_ignores_member_order():
+    """Check if the key depends on the members but not on their order."""
+    cache = VerificationCache()
+    key = cache.key(["A", "B"], medium=[("R_EX_glc_e", -10)])
+    assert key == cache.key(["B", "A"], medium=[("R_EX_glc_e", -10)])
+    assert key != cache.key(["A", "B"], medium=[("R_EX_glc_e", -5)])
+    assert key != VerificationCache(namespace="other").key(
+        ["A", "B"], medium=[("R_EX_glc_e", -10)]
+    )
+
+
+def test_cache_failed_verification():
+    """Check if failed verifications are distinguished from missing entries."""
+    cache = VerificationCache()
+    assert cache.get("missing") == (False, None)
+    cache.put("failed", None)
+    assert cache.get("failed") == (True, None)
+
+
+def test_evict_least_recently_used():
+    """Check if the least recently used entry is evicted."""
+    cache = VerificationCache(maxsize=2)
+    cache.put("a", {"Growth_A": 1})
+    cache.put("b", {"Growth_B": 1})
+    cache.get("a")
+    cache.put("c", {"Growth_C": 1})
+    assert cache.get("a") == (True, {"Growth_A": 1})
+    assert cache.get("b") == (False, None)
+
+
+def test_disk_store(tmp_path):
+    """Check if results are reused from the disk store."""
+    VerificationCache(cache_dir=str(tmp_path)).put("a", {"Growth_A": 1})
+    assert len(os.listdir(tmp_path)) == 1
+    assert VerificationCache(cache_dir=str(tmp_path)).get("a") == (
+        True,
+        {"Growth_A": 1},
+    )